@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Prompt-keyed cache of rendered video clips.
+
+Long-form scripts often repeat near-identical prompts (intros, outros,
+B-roll). Clips are stored under a key built from the normalized prompt and
+every other generation parameter, so a repeat skips the fal.ai call entirely.
+
+Optionally, prompts can also be matched by sentence-embedding similarity
+(requires sentence-transformers and numpy). Fuzzy reuse is opt-in because
+it returns a clip rendered from a different - if very similar - prompt.
+"""
+
+import os
+import shutil
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Any, Tuple
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    HAS_EMBEDDINGS = True
+except ImportError:
+    HAS_EMBEDDINGS = False
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt"""
+    return " ".join(prompt.lower().split())
+
+
+def _digest(value: Any) -> str:
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+class ClipCache:
+    """Clip files under cache_dir, keyed by prompt + generation parameters"""
+
+    def __init__(self, cache_dir: Path, similarity_threshold: Optional[float] = None):
+        """
+        Args:
+            cache_dir: Directory holding cached clips
+            similarity_threshold: Cosine similarity (e.g. 0.97) above which a
+                clip from a different prompt is reused. None disables fuzzy
+                matching; it is also disabled if sentence-transformers is
+                not installed.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.similarity_threshold = similarity_threshold if HAS_EMBEDDINGS else None
+
+        self._lock = threading.Lock()
+        self._encoder = None
+        self.db = None
+        if self.similarity_threshold is not None:
+            self.db = sqlite3.connect(
+                str(self.cache_dir / "embeddings.sqlite"),
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS clips(key TEXT PRIMARY KEY, params TEXT, vec BLOB)"
+            )
+
+    def key(self, prompt: str, params: Tuple) -> str:
+        """Exact cache key for a prompt and its non-prompt parameters"""
+        return _digest((normalize_prompt(prompt), params))
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp4"
+
+    def get(self, prompt: str, params: Tuple) -> Optional[Path]:
+        """Return a cached clip for this prompt (exact, then fuzzy), if any"""
+        path = self.path_for(self.key(prompt, params))
+        if path.exists():
+            return path
+        if self.db is None:
+            return None
+        return self._get_similar(prompt, params)
+
+    def put(self, prompt: str, params: Tuple, clip_path: Path) -> Path:
+        """Store a rendered clip (hardlinked when possible) and index it"""
+        key = self.key(prompt, params)
+        path = self.path_for(key)
+        if not path.exists():
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            try:
+                os.link(clip_path, tmp_path)
+            except OSError:
+                shutil.copyfile(clip_path, tmp_path)
+            os.replace(tmp_path, path)
+
+        if self.db is not None:
+            vec = self._embed(prompt)
+            with self._lock:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO clips(key, params, vec) VALUES (?, ?, ?)",
+                    (key, _digest(params), vec.tobytes())
+                )
+        return path
+
+    @staticmethod
+    def copy_to(cached_path: Path, output_path: Path) -> Path:
+        """Materialize a cached clip at output_path (hardlink, else copy)"""
+        if cached_path.resolve() == output_path.resolve():
+            return output_path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.unlink(missing_ok=True)
+        try:
+            os.link(cached_path, output_path)
+        except OSError:
+            shutil.copyfile(cached_path, output_path)
+        return output_path
+
+    def _embed(self, prompt: str):
+        """Unit-normalized float32 embedding of the normalized prompt"""
+        with self._lock:
+            if self._encoder is None:
+                self._encoder = SentenceTransformer(EMBEDDING_MODEL)
+            vec = self._encoder.encode(normalize_prompt(prompt), normalize_embeddings=True)
+        return np.asarray(vec, dtype=np.float32)
+
+    def _get_similar(self, prompt: str, params: Tuple) -> Optional[Path]:
+        """Closest cached clip with identical params above the similarity threshold"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT key, vec FROM clips WHERE params = ?", (_digest(params),)
+            ).fetchall()
+        if not rows:
+            return None
+
+        query = self._embed(prompt)
+        vectors = np.stack([np.frombuffer(vec, dtype=np.float32) for _, vec in rows])
+        scores = vectors @ query  # embeddings are unit length, so dot == cosine
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        path = self.path_for(rows[best][0])
+        return path if path.exists() else None
@@ -29,6 +29,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 import tempfile
 
+from motion_graphics import h264_encoder_args
+
 # Try to import image processing libraries
 try:
     from PIL import Image, ImageDraw, ImageFont, ImageFilter
@@ -156,8 +158,13 @@ class ColorExtractor:
     Reference: https://medium.com/@isami.dono/extract-dominant-color-of-each-frame
     """
 
-    def __init__(self, n_colors: int = 5):
+    # Width frames are scaled to before clustering; palette extraction
+    # doesn't need full resolution
+    SAMPLE_WIDTH = 160
+
+    def __init__(self, n_colors: int = 5, sample_frames: int = 8):
         self.n_colors = n_colors
+        self.sample_frames = sample_frames
 
     def extract_frame(self, video_path: Path, timestamp: float = 5.0) -> Optional[Path]:
         """Extract a single frame from video at given timestamp."""
@@ -175,6 +182,28 @@ class ColorExtractor:
         result = subprocess.run(cmd, capture_output=True)
         return temp_frame if temp_frame.exists() else None
 
+    def extract_frame_pixels(self, video_path: Path, timestamp: float) -> Optional["np.ndarray"]:
+        """
+        Decode the first keyframe at/after timestamp as an (N, 3) RGB array.
+
+        Only keyframes are decoded and the frame is downscaled and piped
+        as raw RGB, so no image file is written or re-read.
+        """
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-skip_frame", "nokey",
+            "-ss", str(timestamp),
+            "-i", str(video_path),
+            "-frames:v", "1",
+            "-vf", f"scale={self.SAMPLE_WIDTH}:-2",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "pipe:1"
+        ]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if result.returncode != 0 or not result.stdout:
+            return None
+        return np.frombuffer(result.stdout, dtype=np.uint8).reshape(-1, 3)
+
     def extract_colors(self, image_path: Path) -> List[str]:
         """Extract dominant colors from an image using K-means."""
         if not HAS_PIL or not HAS_SKLEARN:
@@ -188,22 +217,44 @@ class ColorExtractor:
             img.thumbnail((200, 200))
 
             # Convert to numpy array
-            pixels = np.array(img).reshape(-1, 3)
+            return self.cluster_colors(np.array(img).reshape(-1, 3))
+
+        except Exception as e:
+            print(f"    Color extraction error: {e}")
+            return ["#FFFFFF", "#000000", "#3498db"]
+
+    def cluster_colors(self, pixels: "np.ndarray") -> List[str]:
+        """Dominant colors of an (N, 3) RGB pixel array, most frequent first."""
+        if not HAS_SKLEARN:
+            return ["#FFFFFF", "#000000", "#3498db"]
 
+        try:
             # Remove very dark pixels (letterboxing)
             mask = np.sum(pixels, axis=1) > 30
             pixels = pixels[mask]
 
-            if len(pixels) < self.n_colors:
+            # Quantize to 5 bits per channel (a 32768-entry histogram), so
+            # k-means runs on the distinct colors weighted by pixel count
+            # instead of on every pixel
+            rgb = pixels.astype(np.uint16) >> 3
+            keys = (rgb[:, 0] << 10) | (rgb[:, 1] << 5) | rgb[:, 2]
+            hist = np.bincount(keys, minlength=1 << 15)
+            bins = np.nonzero(hist)[0]
+
+            if len(bins) < self.n_colors:
                 return ["#FFFFFF", "#000000", "#3498db"]
 
+            # Bucket centers back in 0-255 space
+            bin_colors = np.stack([(bins >> 10) & 31, (bins >> 5) & 31, bins & 31], axis=1) * 8 + 4
+            weights = hist[bins]
+
             # K-means clustering
             kmeans = KMeans(n_clusters=self.n_colors, random_state=42, n_init=10)
-            kmeans.fit(pixels)
+            kmeans.fit(bin_colors, sample_weight=weights)
 
-            # Get cluster centers and sort by frequency
+            # Get cluster centers and sort by pixel frequency
             colors = kmeans.cluster_centers_.astype(int)
-            labels, counts = np.unique(kmeans.labels_, return_counts=True)
+            counts = np.bincount(kmeans.labels_, weights=weights, minlength=self.n_colors)
             sorted_idx = np.argsort(-counts)
 
             # Convert to hex
@@ -218,34 +269,46 @@ class ColorExtractor:
             print(f"    Color extraction error: {e}")
             return ["#FFFFFF", "#000000", "#3498db"]
 
+    def _sample_timestamps(self, video_path: Path) -> List[float]:
+        """sample_frames timestamps spread across the video (10%-90%)."""
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "json",
+            str(video_path)
+        ]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            duration = float(json.loads(result.stdout)["format"]["duration"])
+        except:
+            return [5.0, 15.0, 30.0]
+
+        n = max(1, self.sample_frames)
+        return [duration * (0.1 + 0.8 * i / max(1, n - 1)) for i in range(n)]
+
     def extract_from_video(
         self,
         video_path: Path,
         timestamps: List[float] = None
     ) -> ColorPalette:
-        """Extract color palette from multiple video frames."""
-        if timestamps is None:
-            timestamps = [5.0, 15.0, 30.0]
+        """
+        Extract color palette from keyframes sampled across the video.
 
-        all_colors = []
+        Pixels from all sampled frames are clustered together, so the
+        palette reflects the whole video rather than per-frame votes.
+        """
+        if not HAS_SKLEARN:
+            return ColorPalette()
 
-        for ts in timestamps:
-            frame = self.extract_frame(video_path, ts)
-            if frame:
-                colors = self.extract_colors(frame)
-                all_colors.extend(colors)
-                frame.unlink()  # Clean up
+        if timestamps is None:
+            timestamps = self._sample_timestamps(video_path)
 
-        # Find most common colors
-        if not all_colors:
+        frames = [self.extract_frame_pixels(video_path, ts) for ts in timestamps]
+        frames = [f for f in frames if f is not None]
+        if not frames:
             return ColorPalette()
 
-        # Simple frequency count
-        color_counts = {}
-        for c in all_colors:
-            color_counts[c] = color_counts.get(c, 0) + 1
-
-        sorted_colors = sorted(color_counts.keys(), key=lambda x: -color_counts[x])
+        sorted_colors = self.cluster_colors(np.concatenate(frames))
 
         # Choose accent from mid-range brightness (not too dark, not too white)
         accent = "#3498db"
@@ -620,6 +683,29 @@ class FFmpegTextRenderer:
 
         return name_filter
 
+    def build_filter_chain(
+        self,
+        overlays: List[Dict],
+        video_width: int = 1920,
+        video_height: int = 1080
+    ) -> str:
+        """
+        Build one comma-joined drawtext chain for several lower thirds.
+
+        overlays: [{"name": "...", "title": "...", "start": 0, "duration": 5}, ...]
+        """
+        return ",".join(
+            self.create_lower_third_filter(
+                name=ov.get("name", ""),
+                title=ov.get("title", ""),
+                start_time=ov.get("start", 0),
+                duration=ov.get("duration", 5),
+                video_width=video_width,
+                video_height=video_height
+            )
+            for ov in overlays
+        )
+
     def apply_text_overlay(
         self,
         video_path: Path,
@@ -639,7 +725,7 @@ class FFmpegTextRenderer:
             "-of", "json",
             str(video_path)
         ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        result = subprocess.run(probe_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
 
         try:
             data = json.loads(result.stdout)
@@ -648,26 +734,13 @@ class FFmpegTextRenderer:
         except:
             width, height = 1920, 1080
 
-        # Build filter chain
-        filters = []
-        for ov in overlays:
-            f = self.create_lower_third_filter(
-                name=ov.get("name", ""),
-                title=ov.get("title", ""),
-                start_time=ov.get("start", 0),
-                duration=ov.get("duration", 5),
-                video_width=width,
-                video_height=height
-            )
-            filters.append(f)
-
-        filter_chain = ",".join(filters)
+        filter_chain = self.build_filter_chain(overlays, width, height)
 
         cmd = [
             "ffmpeg", "-y",
             "-i", str(video_path),
             "-vf", filter_chain,
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+            *h264_encoder_args(height),
             "-c:a", "copy",
             str(output_path)
         ]
@@ -7,13 +7,17 @@ Handles authentication, rate limiting, retries, and progress tracking.
 import os
 import sys
 import time
+import random
+import asyncio
+import threading
 import json
 import hashlib
+import shutil
 import requests
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Optional, Callable, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List, Set
 
 # Check for fal_client library
 try:
@@ -23,6 +27,16 @@ except ImportError:
     os.system(f"{sys.executable} -m pip install fal-client -q")
     import fal_client
 
+sys.path.insert(0, str(Path(__file__).parent))
+from job_store import JobStore
+from pipeline_log import logger, setup_logging
+from clip_cache import ClipCache
+
+
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+DOWNLOAD_TIMEOUT = 300  # seconds
+MAX_RETRY_WAIT = 30  # seconds, cap on the exponential retry backoff
+
 
 @dataclass
 class FalConfig:
@@ -32,6 +46,10 @@ class FalConfig:
     max_concurrent: int = 2
     cache_dir: Optional[Path] = None
     output_dir: Optional[Path] = None
+    job_store_path: Optional[Path] = None  # SQLite file for resumable runs
+    clip_similarity: Optional[float] = None  # e.g. 0.97 to reuse near-identical prompts
+    breaker_fail_max: int = 5  # consecutive failures before calls fail fast
+    breaker_reset_timeout: float = 60.0  # seconds before a trial call is let through
 
 
 class RateLimiter:
@@ -49,6 +67,56 @@ class RateLimiter:
         self.active_requests = max(0, self.active_requests - 1)
 
 
+class CircuitOpenError(Exception):
+    """Raised instead of calling fal.ai while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated fal.ai failures.
+
+    Opens after fail_max consecutive failures; while open, calls raise
+    CircuitOpenError without hitting the API. After reset_timeout exactly
+    one trial call is let through: a success closes the circuit, a failure
+    re-opens it. Other callers keep failing fast while the trial runs (or,
+    if it never reports back, for another reset_timeout).
+    """
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 60.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(
+                    f"fal.ai circuit open after {self.failures} consecutive failures"
+                )
+            # Half-open: admit this caller as the trial and restart the timer
+            # so nobody else gets through until the trial resolves
+            self.opened_at = time.monotonic()
+            self.half_open = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.half_open or (self.failures >= self.fail_max and self.opened_at is None):
+                self.opened_at = time.monotonic()
+                self.half_open = False
+                logger.warning(f"  Circuit open: pausing fal.ai calls for {self.reset_timeout:.0f}s")
+
+
 class FalClient:
     """Wrapper for fal.ai API with retry logic and caching"""
 
@@ -56,18 +124,79 @@ class FalClient:
         self.config = config
         os.environ['FAL_KEY'] = config.api_key
         self.rate_limiter = RateLimiter(config.max_concurrent)
+        self.breaker = CircuitBreaker(config.breaker_fail_max, config.breaker_reset_timeout)
         self.cache: Dict[str, Any] = {}
 
+        # Directories already created, so per-file writes skip the mkdir syscalls
+        self._created_dirs: Set[Path] = set()
         if config.output_dir:
-            config.output_dir.mkdir(parents=True, exist_ok=True)
+            self.ensure_dir(config.output_dir)
         if config.cache_dir:
-            config.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.ensure_dir(config.cache_dir)
+
+        self.job_store = JobStore(config.job_store_path) if config.job_store_path else None
+        # Rendered video clips keyed by normalized prompt + parameters
+        self.clip_cache = (
+            ClipCache(config.cache_dir / "clips", config.clip_similarity)
+            if config.cache_dir else None
+        )
+        # Reuse connections across downloads (urllib3 pools are thread-safe)
+        self.session = requests.Session()
+
+    def ensure_dir(self, path: Path) -> Path:
+        """Create path (and parents) once per client"""
+        if path not in self._created_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path)
+        return path
 
     def _get_cache_key(self, model: str, arguments: Dict) -> str:
         """Generate cache key from model and arguments"""
         content = json.dumps({"model": model, **arguments}, sort_keys=True)
         return hashlib.sha256(content.encode()).hexdigest()[:16]
 
+    def get_completed_job(
+        self,
+        model: str,
+        arguments: Dict[str, Any],
+        output_path: Path
+    ) -> Optional[str]:
+        """
+        Look up a previously completed job in the job store.
+
+        On a hit the stored file is made available at output_path and the
+        original result URL is returned; otherwise returns None.
+        """
+        if not self.job_store:
+            return None
+
+        job = self.job_store.get(self._get_cache_key(model, arguments))
+        if not job:
+            return None
+
+        stored_path = Path(job["path"])
+        if stored_path.resolve() != output_path.resolve():
+            # Copy beside output_path and rename, so a file another job's
+            # record points at is never half-written
+            self.ensure_dir(output_path.parent)
+            part_path = output_path.with_name(output_path.name + ".part")
+            shutil.copyfile(stored_path, part_path)
+            os.replace(part_path, output_path)
+
+        logger.info(f"  Reusing completed job: {stored_path}")
+        return job["url"]
+
+    def record_completed_job(
+        self,
+        model: str,
+        arguments: Dict[str, Any],
+        url: str,
+        output_path: Path
+    ):
+        """Record a downloaded result so later runs can skip regenerating it"""
+        if self.job_store:
+            self.job_store.put(self._get_cache_key(model, arguments), url, output_path)
+
     def _on_queue_update(self, update, progress_callback: Optional[Callable] = None):
         """Handle progress updates during generation"""
         if isinstance(update, fal_client.InProgress):
@@ -76,7 +205,7 @@ class FalClient:
                 if progress_callback:
                     progress_callback(msg)
                 else:
-                    print(f"  Progress: {msg}")
+                    logger.info(f"  Progress: {msg}")
 
     def generate(
         self,
@@ -100,12 +229,13 @@ class FalClient:
         # Check cache
         cache_key = self._get_cache_key(model, arguments)
         if use_cache and cache_key in self.cache:
-            print(f"  Using cached result for {model}")
+            logger.info(f"  Using cached result for {model}")
             return self.cache[cache_key]
 
         self.rate_limiter.acquire()
         try:
             for attempt in range(self.config.max_retries):
+                self.breaker.check()
                 try:
                     # Use module-level subscribe function
                     result = fal_client.subscribe(
@@ -115,6 +245,8 @@ class FalClient:
                         on_queue_update=lambda u: self._on_queue_update(u, progress_callback)
                     )
 
+                    self.breaker.record_success()
+
                     # Cache result
                     if use_cache:
                         self.cache[cache_key] = result
@@ -122,35 +254,110 @@ class FalClient:
                     return result
 
                 except Exception as e:
-                    error_str = str(e).lower()
-                    if "validation" in error_str or "content" in error_str or "policy" in error_str:
-                        print(f"  Validation error (content policy): {e}")
-                        raise
-                    elif "rate" in error_str or "limit" in error_str:
-                        wait_time = (2 ** attempt) * 5
-                        print(f"  Rate limited. Waiting {wait_time}s...")
-                        time.sleep(wait_time)
-                    elif attempt == self.config.max_retries - 1:
-                        raise
-                    else:
-                        wait_time = (2 ** attempt) * 2
-                        print(f"  Retry {attempt + 1}/{self.config.max_retries} in {wait_time}s: {e}")
-                        time.sleep(wait_time)
+                    time.sleep(self._retry_wait(e, attempt))
 
             raise Exception(f"Max retries exceeded for {model}")
         finally:
             self.rate_limiter.release()
 
+    async def generate_async(
+        self,
+        model: str,
+        arguments: Dict[str, Any],
+        use_cache: bool = True,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 10.0
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate() using the fal queue API.
+
+        Submits the request, polls its status with exponential backoff until
+        it completes, then fetches the result. Many calls can be awaited
+        together so their inference time overlaps.
+
+        Args:
+            model: Model ID (e.g., "fal-ai/veo3.1/fast")
+            arguments: Model-specific arguments
+            use_cache: Whether to use caching
+            poll_interval: Initial seconds between status polls
+            max_poll_interval: Upper bound on the poll backoff
+
+        Returns:
+            Model response dict
+        """
+        cache_key = self._get_cache_key(model, arguments)
+        if use_cache and cache_key in self.cache:
+            logger.info(f"  Using cached result for {model}")
+            return self.cache[cache_key]
+
+        for attempt in range(self.config.max_retries):
+            self.breaker.check()
+            try:
+                handle = await fal_client.submit_async(model, arguments=arguments)
+
+                backoff = poll_interval
+                while not isinstance(await handle.status(), fal_client.Completed):
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 1.5, max_poll_interval)
+
+                result = await handle.get()
+                self.breaker.record_success()
+
+                if use_cache:
+                    self.cache[cache_key] = result
+
+                return result
+
+            except Exception as e:
+                await asyncio.sleep(self._retry_wait(e, attempt))
+
+        raise Exception(f"Max retries exceeded for {model}")
+
+    def _retry_wait(self, error: Exception, attempt: int) -> float:
+        """Re-raise non-retryable errors, otherwise return seconds to wait before retrying"""
+        error_str = str(error).lower()
+        if "validation" in error_str or "content" in error_str or "policy" in error_str:
+            logger.warning(f"  Validation error (content policy): {error}")
+            raise error
+
+        # Only service-side failures count toward opening the circuit
+        self.breaker.record_failure()
+        # Jitter spreads out retries from many concurrent scenes failing at once
+        jitter = random.uniform(0, 1)
+        if "rate" in error_str or "limit" in error_str:
+            wait_time = min((2 ** attempt) * 5, MAX_RETRY_WAIT) + jitter
+            logger.warning(f"  Rate limited. Waiting {wait_time:.1f}s...")
+            return wait_time
+        elif attempt == self.config.max_retries - 1:
+            raise error
+        else:
+            wait_time = min((2 ** attempt) * 2, MAX_RETRY_WAIT) + jitter
+            logger.warning(f"  Retry {attempt + 1}/{self.config.max_retries} in {wait_time:.1f}s: {error}")
+            return wait_time
+
     def download_file(self, url: str, output_path: Path) -> Path:
-        """Download a file from URL to local path"""
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
+        """
+        Stream a file from URL to local path.
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        The body is copied to disk in 1 MiB chunks so peak memory stays flat
+        regardless of file size. It is written to a .part file first and
+        renamed on completion, so an interrupted download never leaves a
+        truncated file at output_path; a failed one removes the .part file.
+        """
+        self.ensure_dir(output_path.parent)
+        part_path = output_path.with_name(output_path.name + ".part")
 
+        try:
+            with self.session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        os.replace(part_path, output_path)
         return output_path
 
     def batch_generate(
@@ -186,7 +393,7 @@ class FalClient:
                 try:
                     results[idx] = future.result()
                 except Exception as e:
-                    print(f"  Task {idx} failed: {e}")
+                    logger.error(f"  Task {idx} failed: {e}")
                     results[idx] = {"error": str(e)}
 
         return results
@@ -218,6 +425,7 @@ MODELS = {
 
 if __name__ == "__main__":
     # Test the client
+    setup_logging()
     api_key = os.environ.get("FAL_KEY")
     if not api_key:
         print("Set FAL_KEY environment variable to test")
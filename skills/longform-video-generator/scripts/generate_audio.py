@@ -13,6 +13,7 @@ from typing import Optional, List, Dict, Any
 
 sys.path.insert(0, str(Path(__file__).parent))
 from fal_wrapper import FalClient, FalConfig, MODELS
+from pipeline_log import setup_logging
 
 
 def generate_music(
@@ -46,6 +47,17 @@ def generate_music(
     if duration_ms:
         arguments["music_length_ms"] = duration_ms
 
+    cached_url = client.get_completed_job(MODELS["elevenlabs_music"], arguments, output_path)
+    if cached_url:
+        return {
+            "success": True,
+            "url": cached_url,
+            "local_path": str(output_path),
+            "prompt": prompt,
+            "type": "music",
+            "cached": True
+        }
+
     print(f"Generating music...")
     print(f"  Prompt: {prompt[:100]}...")
 
@@ -57,6 +69,7 @@ def generate_music(
     if audio_url:
         print(f"  Downloading to {output_path}...")
         client.download_file(audio_url, output_path)
+        client.record_completed_job(MODELS["elevenlabs_music"], arguments, audio_url, output_path)
         return {
             "success": True,
             "url": audio_url,
@@ -256,6 +269,7 @@ def generate_audio_assets(
 
 
 def main():
+    setup_logging()
     parser = argparse.ArgumentParser(description="Generate audio using fal.ai ElevenLabs")
     subparsers = parser.add_subparsers(dest="command", help="Audio type")
 
@@ -6,13 +6,14 @@ Used for storyboard frames and image-to-video source images.
 
 import os
 import sys
-import json
 import argparse
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable
 
 sys.path.insert(0, str(Path(__file__).parent))
 from fal_wrapper import FalClient, FalConfig, MODELS
+from pipeline_log import logger, setup_logging
+import json_io
 
 
 def generate_image(
@@ -55,8 +56,20 @@ def generate_image(
         "num_images": num_images
     }
 
-    print(f"Generating image with {model_id}...")
-    print(f"  Prompt: {prompt[:100]}...")
+    cached_url = client.get_completed_job(model_id, arguments, output_path)
+    if cached_url:
+        return {
+            "success": True,
+            "url": cached_url,
+            "local_path": str(output_path),
+            "prompt": prompt,
+            "model": model_id,
+            "all_images": [cached_url],
+            "cached": True
+        }
+
+    logger.info(f"Generating image with {model_id}...")
+    logger.info(f"  Prompt: {prompt[:100]}...")
 
     result = client.generate(model_id, arguments)
 
@@ -68,8 +81,9 @@ def generate_image(
     if images:
         image_url = images[0].get("url")
         if image_url:
-            print(f"  Downloading to {output_path}...")
+            logger.info(f"  Downloading to {output_path}...")
             client.download_file(image_url, output_path)
+            client.record_completed_job(model_id, arguments, image_url, output_path)
             return {
                 "success": True,
                 "url": image_url,
@@ -88,7 +102,7 @@ def generate_image(
 
 def generate_storyboard(
     client: FalClient,
-    frames: List[Dict[str, Any]],
+    frames: Iterable[Dict[str, Any]],
     output_dir: Path,
     model: str = "nano_banana_pro",
     aspect_ratio: str = "16:9",
@@ -100,7 +114,8 @@ def generate_storyboard(
 
     Args:
         client: FalClient instance
-        frames: List of frame descriptions (dicts with 'prompt' key or strings)
+        frames: Frame descriptions (dicts with 'prompt' key or strings); any
+            iterable is accepted so frames can be streamed from disk
         output_dir: Directory to save images
         model: Image model to use
         aspect_ratio: Aspect ratio for all frames
@@ -112,9 +127,11 @@ def generate_storyboard(
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     results = []
+    total = f"/{len(frames)}" if hasattr(frames, "__len__") else ""
+    prefix = f"{style_prefix}. " if style_prefix else ""
 
     for idx, frame in enumerate(frames):
-        print(f"\n[Frame {idx + 1}/{len(frames)}]")
+        logger.info(f"\n[Frame {idx + 1}{total}]")
 
         if isinstance(frame, dict):
             prompt = frame.get("prompt", "")
@@ -126,8 +143,7 @@ def generate_storyboard(
             frame_aspect = aspect_ratio
 
         # Apply style prefix
-        if style_prefix:
-            prompt = f"{style_prefix}. {prompt}"
+        prompt = prefix + prompt
 
         output_path = output_dir / f"frame_{idx:03d}.png"
 
@@ -184,9 +200,9 @@ def generate_image_with_reference(
         "num_images": num_images
     }
 
-    print(f"Generating image with reference using {model_id}...")
-    print(f"  Prompt: {prompt[:100]}...")
-    print(f"  References: {len(reference_urls)} image(s)")
+    logger.info(f"Generating image with reference using {model_id}...")
+    logger.info(f"  Prompt: {prompt[:100]}...")
+    logger.info(f"  References: {len(reference_urls)} image(s)")
 
     result = client.generate(model_id, arguments)
 
@@ -198,7 +214,7 @@ def generate_image_with_reference(
     if images:
         image_url = images[0].get("url")
         if image_url:
-            print(f"  Downloading to {output_path}...")
+            logger.info(f"  Downloading to {output_path}...")
             client.download_file(image_url, output_path)
             return {
                 "success": True,
@@ -245,9 +261,10 @@ def generate_storyboard_with_character_consistency(
     results = []
     character_refs = character_refs or {}
     generated_character_refs = {}  # Track generated character images
+    prefix = f"{style_prefix}. " if style_prefix else ""
 
     for idx, frame in enumerate(frames):
-        print(f"\n[Frame {idx + 1}/{len(frames)}]")
+        logger.info(f"\n[Frame {idx + 1}/{len(frames)}]")
 
         if isinstance(frame, dict):
             prompt = frame.get("prompt", "")
@@ -259,8 +276,7 @@ def generate_storyboard_with_character_consistency(
             frame_aspect = aspect_ratio
 
         # Apply style prefix
-        if style_prefix:
-            prompt = f"{style_prefix}. {prompt}"
+        prompt = prefix + prompt
 
         output_path = output_dir / f"frame_{idx:03d}.png"
 
@@ -348,6 +364,7 @@ def generate_style_consistent_frames(
 
 
 def main():
+    setup_logging()
     parser = argparse.ArgumentParser(description="Generate images using fal.ai")
     parser.add_argument("prompt", nargs="?", help="Image prompt (or use --frames)")
     parser.add_argument("-o", "--output", default="output.png", help="Output file path")
@@ -378,9 +395,8 @@ def main():
     client = FalClient(config)
 
     if args.frames:
-        # Generate storyboard from JSON file
-        with open(args.frames) as f:
-            frames = json.load(f)
+        # Stream frames from the JSON array so generation starts immediately
+        frames = json_io.iter_items(args.frames)
 
         results = generate_storyboard(
             client=client,
@@ -394,9 +410,8 @@ def main():
 
         # Save results
         results_path = Path(args.frames_dir) / "results.json"
-        with open(results_path, "w") as f:
-            json.dump(results, f, indent=2)
-        print(f"\nResults saved to {results_path}")
+        json_io.dump_file(results, results_path)
+        logger.info(f"\nResults saved to {results_path}")
 
     elif args.prompt:
         # Generate single image
@@ -411,11 +426,11 @@ def main():
         )
 
         if result["success"]:
-            print(f"\nImage saved to: {result['local_path']}")
+            logger.info(f"\nImage saved to: {result['local_path']}")
             if args.num > 1:
-                print(f"All URLs: {result.get('all_images', [])}")
+                logger.info(f"All URLs: {result.get('all_images', [])}")
         else:
-            print(f"\nError: {result.get('error')}")
+            logger.error(f"\nError: {result.get('error')}")
             sys.exit(1)
     else:
         parser.print_help()
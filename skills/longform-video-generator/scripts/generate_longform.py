@@ -7,8 +7,8 @@ background music, and optional narration.
 
 import os
 import sys
-import json
 import argparse
+import shutil
 import tempfile
 from pathlib import Path
 from typing import Optional, List, Dict, Any
@@ -16,6 +16,8 @@ from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent))
 from fal_wrapper import FalClient, FalConfig, MODELS
+from pipeline_log import logger, setup_logging
+import json_io
 from generate_video import generate_video_sequence
 from generate_images import generate_storyboard
 from generate_audio import generate_music, generate_sound_effect, generate_speech
@@ -28,6 +30,10 @@ from stitch_video import (
     add_crossfade_transitions
 )
 
+# Completed-job record shared by every project under an output dir, so a
+# re-run after an interruption reuses frames/scenes/music already generated
+JOB_STORE_NAME = ".jobs.sqlite"
+
 
 def create_project_structure(base_dir: Path, project_name: str) -> Dict[str, Path]:
     """Create project directory structure"""
@@ -82,7 +88,8 @@ def generate_longform_video(
     aspect_ratio: str = "16:9",
     include_music: bool = True,
     include_transitions: bool = True,
-    use_storyboard: bool = False
+    use_storyboard: bool = False,
+    keep_intermediate: bool = False
 ) -> Dict[str, Any]:
     """
     Generate a complete long-form video from a structured concept.
@@ -98,6 +105,7 @@ def generate_longform_video(
         include_music: Generate and add background music
         include_transitions: Add crossfade transitions between scenes
         use_storyboard: Generate storyboard images first for image-to-video
+        keep_intermediate: Keep the concatenated temp video when no music is added
 
     Returns:
         Dict with results and output paths
@@ -116,16 +124,15 @@ def generate_longform_video(
 
     # Step 1: Generate storyboard images (optional)
     if use_storyboard:
-        print("\n" + "=" * 50)
-        print("STEP 1: Generating Storyboard Images")
-        print("=" * 50)
+        logger.info("\n" + "=" * 50)
+        logger.info("STEP 1: Generating Storyboard Images")
+        logger.info("=" * 50)
 
+        style_prefix = f"{style}. " if style else ""
         storyboard_frames = []
         for scene in scenes:
             prompt = scene.get("prompt", scene) if isinstance(scene, dict) else scene
-            if style:
-                prompt = f"{style}. {prompt}"
-            storyboard_frames.append({"prompt": prompt})
+            storyboard_frames.append({"prompt": style_prefix + prompt})
 
         storyboard_results = generate_storyboard(
             client=client,
@@ -145,9 +152,9 @@ def generate_longform_video(
                     scenes[i] = {"prompt": scene, "image_url": sb_result["url"]}
 
     # Step 2: Generate video clips
-    print("\n" + "=" * 50)
-    print("STEP 2: Generating Video Scenes")
-    print("=" * 50)
+    logger.info("\n" + "=" * 50)
+    logger.info("STEP 2: Generating Video Scenes")
+    logger.info("=" * 50)
 
     video_results = generate_video_sequence(
         client=client,
@@ -156,7 +163,8 @@ def generate_longform_video(
         model=video_model,
         resolution=resolution,
         aspect_ratio=aspect_ratio,
-        generate_audio=True  # Generate audio with video for better sync
+        # Native audio keeps lip/sound sync, and stitching mixes music over it
+        generate_audio=True
     )
     results["scenes"] = video_results
 
@@ -175,9 +183,9 @@ def generate_longform_video(
     # Step 3: Generate background music (optional)
     music_path = None
     if include_music and concept.get("music_prompt"):
-        print("\n" + "=" * 50)
-        print("STEP 3: Generating Background Music")
-        print("=" * 50)
+        logger.info("\n" + "=" * 50)
+        logger.info("STEP 3: Generating Background Music")
+        logger.info("=" * 50)
 
         # Estimate total video duration
         total_duration_ms = len(video_paths) * 8 * 1000  # Rough estimate
@@ -197,13 +205,13 @@ def generate_longform_video(
             results["errors"].append(f"Music generation failed: {music_result.get('error')}")
 
     # Step 4: Normalize and concatenate videos
-    print("\n" + "=" * 50)
-    print("STEP 4: Stitching Video Scenes")
-    print("=" * 50)
+    logger.info("\n" + "=" * 50)
+    logger.info("STEP 4: Stitching Video Scenes")
+    logger.info("=" * 50)
 
     # Normalize videos first if needed
     if len(video_paths) > 1:
-        print("Normalizing videos...")
+        logger.info("Normalizing videos...")
         normalized_paths = normalize_videos(
             video_paths,
             dirs["temp"],
@@ -232,9 +240,9 @@ def generate_longform_video(
     final_output = dirs["output"] / f"{concept.get('title', 'video')[:30].replace(' ', '_')}.mp4"
 
     if music_path and music_path.exists():
-        print("\n" + "=" * 50)
-        print("STEP 5: Adding Background Music")
-        print("=" * 50)
+        logger.info("\n" + "=" * 50)
+        logger.info("STEP 5: Adding Background Music")
+        logger.info("=" * 50)
 
         success = add_audio_track(
             concat_output,
@@ -246,25 +254,29 @@ def generate_longform_video(
         )
 
         if not success:
-            print("Warning: Failed to add music, using video without music")
+            logger.warning("Warning: Failed to add music, using video without music")
             final_output = concat_output
-    else:
-        # Just rename/copy the concatenated video
-        import shutil
+    elif keep_intermediate:
         shutil.copy(concat_output, final_output)
+    else:
+        # temp/ and output/ share the project dir, so this is normally a rename
+        try:
+            os.replace(concat_output, final_output)
+        except OSError:
+            shutil.copy(concat_output, final_output)
 
     results["output"] = str(final_output)
 
     # Summary
-    print("\n" + "=" * 50)
-    print("GENERATION COMPLETE")
-    print("=" * 50)
-    print(f"Output: {final_output}")
-    print(f"Scenes: {len(video_paths)} generated")
+    logger.info("\n" + "=" * 50)
+    logger.info("GENERATION COMPLETE")
+    logger.info("=" * 50)
+    logger.info(f"Output: {final_output}")
+    logger.info(f"Scenes: {len(video_paths)} generated")
     if results["errors"]:
-        print(f"Errors: {len(results['errors'])}")
+        logger.info(f"Errors: {len(results['errors'])}")
         for err in results["errors"]:
-            print(f"  - {err}")
+            logger.info(f"  - {err}")
 
     return results
 
@@ -279,7 +291,8 @@ def generate_from_prompt(
     resolution: str = "720p",
     aspect_ratio: str = "16:9",
     include_music: bool = True,
-    style: str = "cinematic, high quality"
+    style: str = "cinematic, high quality",
+    keep_intermediate: bool = False
 ) -> Dict[str, Any]:
     """
     Simplified interface: generate a video from a single prompt.
@@ -295,11 +308,16 @@ def generate_from_prompt(
         aspect_ratio: Aspect ratio
         include_music: Include background music
         style: Style prefix for prompts
+        keep_intermediate: Keep the concatenated temp video when no music is added
 
     Returns:
         Generation results
     """
-    config = FalConfig(api_key=api_key, output_dir=output_dir)
+    config = FalConfig(
+        api_key=api_key,
+        output_dir=output_dir,
+        job_store_path=output_dir / JOB_STORE_NAME
+    )
     client = FalClient(config)
 
     # Create project structure
@@ -307,10 +325,12 @@ def generate_from_prompt(
 
     # Parse the prompt into a concept
     # For simple prompts, we'll just duplicate with variations
+    scene_prefix = f"{style}. {prompt}. Scene "
+    scene_suffix = f" of {num_scenes}."
     concept = {
         "title": prompt[:50],
         "scenes": [
-            {"prompt": f"{style}. {prompt}. Scene {i+1} of {num_scenes}.", "duration": scene_duration}
+            {"prompt": f"{scene_prefix}{i + 1}{scene_suffix}", "duration": scene_duration}
             for i in range(num_scenes)
         ],
         "music_prompt": f"Cinematic background music for: {prompt[:100]}. Emotional, atmospheric, instrumental.",
@@ -326,11 +346,13 @@ def generate_from_prompt(
         aspect_ratio=aspect_ratio,
         include_music=include_music,
         include_transitions=True,
-        use_storyboard=False
+        use_storyboard=False,
+        keep_intermediate=keep_intermediate
     )
 
 
 def main():
+    setup_logging()
     parser = argparse.ArgumentParser(
         description="Generate long-form videos from prompts or structured concepts"
     )
@@ -354,6 +376,8 @@ def main():
     parser.add_argument("--no-music", action="store_true",
                        help="Skip music generation")
     parser.add_argument("--concept-file", help="JSON file with structured concept")
+    parser.add_argument("--keep-intermediate", action="store_true",
+                       help="Keep the concatenated temp video alongside the output")
 
     args = parser.parse_args()
 
@@ -366,10 +390,13 @@ def main():
 
     if args.concept_file:
         # Load structured concept from file
-        with open(args.concept_file) as f:
-            concept = json.load(f)
+        concept = json_io.load_file(args.concept_file)
 
-        config = FalConfig(api_key=api_key, output_dir=output_dir)
+        config = FalConfig(
+            api_key=api_key,
+            output_dir=output_dir,
+            job_store_path=output_dir / JOB_STORE_NAME
+        )
         client = FalClient(config)
         dirs = create_project_structure(output_dir, concept.get("title", "video"))
 
@@ -380,7 +407,8 @@ def main():
             video_model=args.model,
             resolution=args.resolution,
             aspect_ratio=args.aspect,
-            include_music=not args.no_music
+            include_music=not args.no_music,
+            keep_intermediate=args.keep_intermediate
         )
 
     elif args.prompt:
@@ -394,7 +422,8 @@ def main():
             resolution=args.resolution,
             aspect_ratio=args.aspect,
             include_music=not args.no_music,
-            style=args.style
+            style=args.style,
+            keep_intermediate=args.keep_intermediate
         )
     else:
         parser.print_help()
@@ -403,11 +432,9 @@ def main():
     # Save results
     if results.get("output"):
         results_path = Path(results["output"]).parent / "generation_results.json"
-        with open(results_path, "w") as f:
-            # Make paths serializable
-            serializable = {k: str(v) if isinstance(v, Path) else v for k, v in results.items()}
-            json.dump(serializable, f, indent=2, default=str)
-        print(f"\nResults saved to: {results_path}")
+        # Paths and other non-JSON values are stringified by json_io
+        json_io.dump_file(results, results_path)
+        logger.info(f"\nResults saved to: {results_path}")
 
     sys.exit(0 if results.get("output") else 1)
 
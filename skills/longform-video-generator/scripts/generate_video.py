@@ -6,48 +6,61 @@ Supports text-to-video and image-to-video generation.
 
 import os
 import sys
-import json
+import asyncio
 import argparse
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple, Union, Iterable
 
 # Import from same directory
 sys.path.insert(0, str(Path(__file__).parent))
 from fal_wrapper import FalClient, FalConfig, MODELS
+from pipeline_log import logger, setup_logging
+import json_io
 
 
-def generate_video_clip(
-    client: FalClient,
-    prompt: str,
-    output_path: Path,
-    model: str = "veo31_fast",
-    duration: str = "8s",
-    resolution: str = "720p",
-    aspect_ratio: str = "16:9",
-    generate_audio: bool = True,
-    negative_prompt: Optional[str] = None,
-    seed: Optional[int] = None,
+@dataclass
+class Scene:
+    """A scene to generate, with per-scene overrides already resolved"""
+    prompt: str
+    duration: str
+    model: str
     image_url: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Generate a single video clip.
-
-    Args:
-        client: FalClient instance
-        prompt: Text description of the video
-        output_path: Where to save the video
-        model: Model key from MODELS dict
-        duration: "4s", "6s", or "8s"
-        resolution: "720p" or "1080p"
-        aspect_ratio: "16:9" or "9:16"
-        generate_audio: Whether to generate audio
-        negative_prompt: What to avoid in the video
-        seed: Random seed for reproducibility
-        image_url: Optional image URL for image-to-video
-
-    Returns:
-        Dict with video URL and metadata
-    """
+    negative_prompt: Optional[str] = None
+
+    @classmethod
+    def from_any(
+        cls,
+        scene: Union["Scene", Dict[str, Any], str],
+        default_duration: str,
+        default_model: str
+    ) -> "Scene":
+        """Normalize a Scene, scene dict, or bare prompt string"""
+        if isinstance(scene, Scene):
+            return scene
+        if isinstance(scene, dict):
+            return cls(
+                prompt=scene.get("prompt", ""),
+                duration=scene.get("duration", default_duration),
+                model=scene.get("model", default_model),
+                image_url=scene.get("image_url"),
+                negative_prompt=scene.get("negative_prompt")
+            )
+        return cls(prompt=str(scene), duration=default_duration, model=default_model)
+
+
+def _build_clip_request(
+    prompt: str,
+    model: str,
+    duration: str,
+    resolution: str,
+    aspect_ratio: str,
+    generate_audio: bool,
+    negative_prompt: Optional[str],
+    seed: Optional[int],
+    image_url: Optional[str]
+) -> Tuple[str, Dict[str, Any]]:
+    """Resolve the model endpoint and build the fal.ai arguments for one clip"""
     model_id = MODELS.get(model, model)
 
     arguments = {
@@ -72,23 +85,67 @@ def generate_video_clip(
             elif "veo3" in model:
                 model_id = MODELS["veo3_i2v"]
 
-    print(f"Generating video with {model_id}...")
-    print(f"  Prompt: {prompt[:100]}...")
+    return model_id, arguments
+
+
+def _clip_cache_params(model_id: str, arguments: Dict[str, Any]) -> Tuple:
+    """Everything besides the prompt that determines a rendered clip"""
+    return (model_id,) + tuple(sorted((k, v) for k, v in arguments.items() if k != "prompt"))
 
-    result = client.generate(model_id, arguments)
 
-    # Download video
+def _cached_clip_result(
+    client: FalClient,
+    model_id: str,
+    arguments: Dict[str, Any],
+    output_path: Path
+) -> Optional[Dict[str, Any]]:
+    """Return a result for a clip already completed or rendered before, if any"""
+    cached_url = client.get_completed_job(model_id, arguments, output_path)
+
+    if not cached_url and client.clip_cache:
+        params = _clip_cache_params(model_id, arguments)
+        cached_path = client.clip_cache.get(arguments["prompt"], params)
+        if not cached_path:
+            return None
+        logger.info(f"  Reusing cached clip: {cached_path}")
+        client.clip_cache.copy_to(cached_path, output_path)
+    elif not cached_url:
+        return None
+
+    return {
+        "success": True,
+        "url": cached_url,
+        "local_path": str(output_path),
+        "prompt": arguments["prompt"],
+        "model": model_id,
+        "cached": True
+    }
+
+
+def _download_clip_result(
+    client: FalClient,
+    result: Dict[str, Any],
+    model_id: str,
+    arguments: Dict[str, Any],
+    output_path: Path
+) -> Dict[str, Any]:
+    """Download the generated video from a fal.ai response"""
     video_data = result.get("video", {})
     video_url = video_data.get("url")
 
     if video_url:
-        print(f"  Downloading to {output_path}...")
+        logger.info(f"  Downloading to {output_path}...")
         client.download_file(video_url, output_path)
+        client.record_completed_job(model_id, arguments, video_url, output_path)
+        if client.clip_cache:
+            client.clip_cache.put(
+                arguments["prompt"], _clip_cache_params(model_id, arguments), output_path
+            )
         return {
             "success": True,
             "url": video_url,
             "local_path": str(output_path),
-            "prompt": prompt,
+            "prompt": arguments["prompt"],
             "model": model_id
         }
     else:
@@ -99,66 +156,206 @@ def generate_video_clip(
         }
 
 
+def generate_video_clip(
+    client: FalClient,
+    prompt: str,
+    output_path: Path,
+    model: str = "veo31_fast",
+    duration: str = "8s",
+    resolution: str = "720p",
+    aspect_ratio: str = "16:9",
+    generate_audio: bool = False,
+    negative_prompt: Optional[str] = None,
+    seed: Optional[int] = None,
+    image_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate a single video clip.
+
+    Args:
+        client: FalClient instance
+        prompt: Text description of the video
+        output_path: Where to save the video
+        model: Model key from MODELS dict
+        duration: "4s", "6s", or "8s"
+        resolution: "720p" or "1080p"
+        aspect_ratio: "16:9" or "9:16"
+        generate_audio: Generate Veo's native audio track (off by default;
+            skip it when voiceover/music are added in post)
+        negative_prompt: What to avoid in the video
+        seed: Random seed for reproducibility
+        image_url: Optional image URL for image-to-video
+
+    Returns:
+        Dict with video URL and metadata
+    """
+    model_id, arguments = _build_clip_request(
+        prompt, model, duration, resolution, aspect_ratio,
+        generate_audio, negative_prompt, seed, image_url
+    )
+
+    cached = _cached_clip_result(client, model_id, arguments, output_path)
+    if cached:
+        return cached
+
+    logger.info(f"Generating video with {model_id}...")
+    logger.info(f"  Prompt: {prompt[:100]}...")
+
+    result = client.generate(model_id, arguments)
+    return _download_clip_result(client, result, model_id, arguments, output_path)
+
+
+async def generate_video_clip_async(
+    client: FalClient,
+    prompt: str,
+    output_path: Path,
+    model: str = "veo31_fast",
+    duration: str = "8s",
+    resolution: str = "720p",
+    aspect_ratio: str = "16:9",
+    generate_audio: bool = False,
+    negative_prompt: Optional[str] = None,
+    seed: Optional[int] = None,
+    image_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of generate_video_clip using the fal queue API.
+
+    Takes the same arguments and returns the same dict. The cache lookup
+    and the download run in a worker thread so they don't stall other
+    clips being polled.
+    """
+    model_id, arguments = _build_clip_request(
+        prompt, model, duration, resolution, aspect_ratio,
+        generate_audio, negative_prompt, seed, image_url
+    )
+
+    cached = await asyncio.to_thread(
+        _cached_clip_result, client, model_id, arguments, output_path
+    )
+    if cached:
+        return cached
+
+    logger.info(f"Submitting video to {model_id}...")
+    logger.info(f"  Prompt: {prompt[:100]}...")
+
+    result = await client.generate_async(model_id, arguments)
+    return await asyncio.to_thread(
+        _download_clip_result, client, result, model_id, arguments, output_path
+    )
+
+
 def generate_video_sequence(
     client: FalClient,
-    scenes: List[Dict[str, Any]],
+    scenes: Iterable[Union[Scene, Dict[str, Any], str]],
     output_dir: Path,
     model: str = "veo31_fast",
     default_duration: str = "8s",
     resolution: str = "720p",
     aspect_ratio: str = "16:9",
-    generate_audio: bool = True
+    generate_audio: bool = False,
+    concurrency: Optional[int] = None,
+    results_path: Optional[Path] = None
 ) -> List[Dict[str, Any]]:
     """
     Generate a sequence of video clips from scene descriptions.
 
+    Scenes are submitted to fal.ai concurrently, so total wall time is close
+    to the slowest scene rather than the sum of all of them. scenes may be
+    a lazy iterator (e.g. json_io.iter_items): a bounded queue feeds worker
+    tasks, so generation starts as soon as the first scene is parsed and only
+    about `concurrency` scenes are held in memory at once.
+
     Args:
         client: FalClient instance
-        scenes: List of scene dicts with 'prompt' and optional overrides
+        scenes: Scene objects, scene dicts with 'prompt' and optional
+            overrides, or bare prompt strings
         output_dir: Directory to save video clips
         model: Default model to use
         default_duration: Default duration per clip
         resolution: Video resolution
         aspect_ratio: Video aspect ratio
-        generate_audio: Whether to generate audio
+        generate_audio: Generate Veo's native audio track (off by default;
+            skip it when voiceover/music are added in post)
+        concurrency: Max scenes in flight (defaults to client max_concurrent)
+        results_path: If set, results so far are rewritten here as each scene
+            finishes, so a crash mid-run doesn't lose completed work
 
     Returns:
-        List of generation results
+        List of generation results, in scene order
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
-    results = []
-
-    for idx, scene in enumerate(scenes):
-        print(f"\n[Scene {idx + 1}/{len(scenes)}]")
+    client.ensure_dir(output_dir)
+    concurrency = concurrency or client.config.max_concurrent
+    total = f"/{len(scenes)}" if hasattr(scenes, "__len__") else ""
 
-        prompt = scene.get("prompt", scene) if isinstance(scene, dict) else scene
-        duration = scene.get("duration", default_duration) if isinstance(scene, dict) else default_duration
-        scene_model = scene.get("model", model) if isinstance(scene, dict) else model
-        image_url = scene.get("image_url") if isinstance(scene, dict) else None
-        negative = scene.get("negative_prompt") if isinstance(scene, dict) else None
+    # Build every output path in the producer, not per-worker
+    output_prefix = str(output_dir / "scene_")
 
-        output_path = output_dir / f"scene_{idx:03d}.mp4"
+    completed: Dict[int, Dict[str, Any]] = {}
 
-        result = generate_video_clip(
+    async def run_scene(idx: int, scene: Scene, output_path: Path) -> Dict[str, Any]:
+        logger.info(f"\n[Scene {idx + 1}{total}]")
+        return await generate_video_clip_async(
             client=client,
-            prompt=prompt,
+            prompt=scene.prompt,
             output_path=output_path,
-            model=scene_model,
-            duration=duration,
+            model=scene.model,
+            duration=scene.duration,
             resolution=resolution,
             aspect_ratio=aspect_ratio,
             generate_audio=generate_audio,
-            negative_prompt=negative,
-            image_url=image_url
+            negative_prompt=scene.negative_prompt,
+            image_url=scene.image_url
         )
 
-        result["scene_index"] = idx
-        results.append(result)
+    async def worker(queue: asyncio.Queue, checkpoint_lock: asyncio.Lock):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            idx, scene, output_path = item
+            try:
+                scene = Scene.from_any(scene, default_duration, model)
+                result = await run_scene(idx, scene, output_path)
+            except Exception as e:
+                logger.error(f"  Scene {idx + 1} failed: {e}")
+                result = {"success": False, "error": str(e)}
+
+            result["scene_index"] = idx
+            completed[idx] = result
+            if results_path:
+                # Serialized off the event loop; the lock keeps checkpoints from
+                # racing on the temp file and writes the newest snapshot last
+                async with checkpoint_lock:
+                    snapshot = [completed[i] for i in sorted(completed)]
+                    await asyncio.to_thread(json_io.dump_file, snapshot, results_path)
+
+    async def run_all():
+        checkpoint_lock = asyncio.Lock()
+        # Bounded so a huge (streamed) scene list isn't read far ahead of the workers
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        workers = [asyncio.create_task(worker(queue, checkpoint_lock)) for _ in range(concurrency)]
+        try:
+            for idx, scene in enumerate(scenes):
+                await queue.put((idx, scene, Path(f"{output_prefix}{idx:03d}.mp4")))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    asyncio.run(run_all())
+
+    results = [completed[i] for i in sorted(completed)]
+    if results_path:
+        json_io.dump_file(results, results_path)
 
     return results
 
 
 def main():
+    setup_logging()
     parser = argparse.ArgumentParser(description="Generate video clips using fal.ai")
     parser.add_argument("prompt", nargs="?", help="Video prompt (or use --scenes)")
     parser.add_argument("-o", "--output", default="output.mp4", help="Output file path")
@@ -171,12 +368,19 @@ def main():
                        help="Video resolution")
     parser.add_argument("-a", "--aspect", default="16:9", choices=["16:9", "9:16"],
                        help="Aspect ratio")
-    parser.add_argument("--no-audio", action="store_true", help="Disable audio generation")
+    parser.add_argument("--audio", action="store_true",
+                       help="Generate native audio with the clip (slower; off by default)")
     parser.add_argument("--image", help="Input image URL for image-to-video")
     parser.add_argument("--negative", help="Negative prompt")
     parser.add_argument("--seed", type=int, help="Random seed")
     parser.add_argument("--scenes", help="JSON file with scene descriptions")
     parser.add_argument("--scenes-dir", default="scenes", help="Output directory for scenes")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="Max scenes generated at once with --scenes")
+    parser.add_argument("--cache-dir", help="Reuse clips rendered from the same prompt/settings")
+    parser.add_argument("--reuse-similar", type=float, metavar="THRESHOLD",
+                       help="Also reuse clips whose prompt embedding similarity exceeds "
+                            "THRESHOLD (e.g. 0.97; needs sentence-transformers and --cache-dir)")
 
     args = parser.parse_args()
 
@@ -187,16 +391,18 @@ def main():
 
     config = FalConfig(
         api_key=api_key,
-        output_dir=Path(args.output).parent if not args.scenes else Path(args.scenes_dir)
+        output_dir=Path(args.output).parent if not args.scenes else Path(args.scenes_dir),
+        cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+        clip_similarity=args.reuse_similar
     )
     client = FalClient(config)
 
     if args.scenes:
-        # Generate sequence from JSON file
-        with open(args.scenes) as f:
-            scenes = json.load(f)
+        # Generate sequence from JSON file, streaming scenes as they parse
+        scenes = json_io.iter_items(args.scenes)
+        results_path = Path(args.scenes_dir) / "results.json"
 
-        results = generate_video_sequence(
+        generate_video_sequence(
             client=client,
             scenes=scenes,
             output_dir=Path(args.scenes_dir),
@@ -204,14 +410,12 @@ def main():
             default_duration=args.duration,
             resolution=args.resolution,
             aspect_ratio=args.aspect,
-            generate_audio=not args.no_audio
+            generate_audio=args.audio,
+            concurrency=args.concurrency,
+            results_path=results_path
         )
 
-        # Save results
-        results_path = Path(args.scenes_dir) / "results.json"
-        with open(results_path, "w") as f:
-            json.dump(results, f, indent=2)
-        print(f"\nResults saved to {results_path}")
+        logger.info(f"\nResults saved to {results_path}")
 
     elif args.prompt:
         # Generate single video
@@ -223,16 +427,16 @@ def main():
             duration=args.duration,
             resolution=args.resolution,
             aspect_ratio=args.aspect,
-            generate_audio=not args.no_audio,
+            generate_audio=args.audio,
             negative_prompt=args.negative,
             seed=args.seed,
             image_url=args.image
         )
 
         if result["success"]:
-            print(f"\nVideo saved to: {result['local_path']}")
+            logger.info(f"\nVideo saved to: {result['local_path']}")
         else:
-            print(f"\nError: {result.get('error')}")
+            logger.error(f"\nError: {result.get('error')}")
             sys.exit(1)
     else:
         parser.print_help()
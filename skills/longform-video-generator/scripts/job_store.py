@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed record of completed fal.ai jobs.
+Lets interrupted pipeline runs skip frames, scenes, and music that were
+already generated and downloaded.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class JobStore:
+    """Persistent map of job key -> (url, local path, timestamp)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit + WAL so worker threads can read while another writes
+        self.db = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs("
+            "key TEXT PRIMARY KEY, url TEXT, path TEXT, ts REAL, size INTEGER, mtime_ns INTEGER)"
+        )
+        # Stores written before size/mtime were tracked: their rows never match
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        for column in ("size", "mtime_ns"):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE jobs ADD COLUMN {column} INTEGER")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the completed job for key if its local file is unchanged.
+
+        Output paths are reused across jobs, so a file that was rewritten
+        since put() (different size or mtime) no longer counts as a hit.
+        """
+        with self._lock:
+            row = self.db.execute(
+                "SELECT url, path, ts, size, mtime_ns FROM jobs WHERE key = ?", (key,)
+            ).fetchone()
+
+        if not row:
+            return None
+        try:
+            stat = os.stat(row[1])
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (row[3], row[4]):
+            return None
+        return {"url": row[0], "path": row[1], "timestamp": row[2]}
+
+    def put(self, key: str, url: str, path: Path):
+        """Record a completed job and the current size/mtime of its file"""
+        stat = os.stat(path)
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO jobs(key, url, path, ts, size, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, str(path), time.time(), stat.st_size, stat.st_mtime_ns)
+            )
+
+    def close(self):
+        with self._lock:
+            self.db.close()
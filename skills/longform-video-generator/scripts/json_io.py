@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+JSON read/write helpers for results, concept, and frame files.
+Uses orjson when installed and falls back to the standard library.
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+# orjson is optional - it is several times faster on large result dicts
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# ijson is optional - lets top-level arrays be consumed before parsing finishes
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+def _default(obj: Any) -> Any:
+    """Serialize values orjson/json don't handle natively (Path, numpy, etc.)"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+def dumps(obj: Any, indent: bool = True) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes"""
+    if HAS_ORJSON:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option, default=_default)
+    return json.dumps(obj, indent=2 if indent else None, default=_default).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON bytes or text"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file"""
+    return loads(Path(path).read_bytes())
+
+
+def dump_file(obj: Any, path: Union[str, Path], indent: bool = True) -> Path:
+    """Serialize obj and atomically replace path with it"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(dumps(obj, indent=indent))
+    os.replace(tmp_path, path)
+    return path
+
+
+def iter_items(path: Union[str, Path]) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Streams with ijson when available so callers can start work on the
+    first item before the rest of the file is parsed.
+    """
+    if not HAS_IJSON:
+        yield from load_file(path)
+        return
+
+    with open(path, "rb") as f:
+        # use_float keeps numbers as float instead of Decimal
+        yield from ijson.items(f, "item", use_float=True)
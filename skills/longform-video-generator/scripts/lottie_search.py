@@ -12,15 +12,191 @@ Sources:
 """
 
 import os
-import json
+import sys
+import time
+import atexit
+import asyncio
+import hashlib
 import requests
 import re
+import uuid
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, ClassVar
 from dataclasses import dataclass
 from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+import shutil
 import tempfile
 
+sys.path.insert(0, str(Path(__file__).parent))
+import json_io
+
+# httpx (with h2) multiplexes requests over one HTTP/2 connection per host
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+# aiohttp/uvloop are optional - async batch I/O falls back to worker threads
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+# blake3 is the fastest content hash available; blake2b is the stdlib fallback
+try:
+    import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+# selectolax parses HTML in C; fall back to a regex scan when it's missing
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        # selectolax < 1.0 only ships the Modest backend
+        from selectolax.parser import HTMLParser  # type: ignore
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+# Animation page links: href="/<name-slug>-animation-<id>"
+_ANIM_RE = re.compile(r'href="/([a-z0-9-]+)-animation-([a-z0-9]+)"')
+_ANIM_HREF_RE = re.compile(r'/([a-z0-9-]+)-animation-([a-z0-9]+)')
+
+# Lottie files are JSON objects; checked instead of fully parsing downloads
+_JSON_OBJECT_START_RE = re.compile(rb'\s*\{')
+
+# Direct Lottie JSON URLs embedded in IconScout pages
+_JSON_RE = re.compile(r'https://[^"]+\.json')
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+# Typed so mypyc doesn't narrow them to None when compiling this module
+_shared_session: Any = None
+_default_search: Optional["UnifiedLottieSearch"] = None
+
+# Negative caches by file path, and the paths changed since they were loaded
+_negative_caches: Dict[Path, Dict[str, list]] = {}
+_dirty_negative_paths: set = set()
+
+
+def _content_digest(data: bytes) -> str:
+    """Short content hash used to key the on-disk animation store."""
+    if HAS_BLAKE3:
+        return blake3.blake3(data).hexdigest()[:16]
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _name_from_url(url: str) -> str:
+    """Default cache name for a direct animation URL."""
+    return url.split('/')[-1].replace('.json', '')
+
+
+def _tmp_sibling(path: Path) -> Path:
+    """Unique temp path next to path, so concurrent writers never collide."""
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _link_cache_entry(link_path: Path, target: Path):
+    """Point a named cache entry at a content-addressed object."""
+    tmp_path = _tmp_sibling(link_path)
+    try:
+        tmp_path.symlink_to(os.path.relpath(target, link_path.parent))
+    except OSError:
+        # No symlink support (e.g. Windows without privileges)
+        try:
+            os.link(target, tmp_path)
+        except OSError:
+            shutil.copyfile(target, tmp_path)
+    os.replace(tmp_path, link_path)
+
+
+def _run_async(coro):
+    """Run a coroutine to completion, on uvloop when it's installed."""
+    if HAS_UVLOOP:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
+def _aiohttp_session() -> "aiohttp.ClientSession":
+    """aiohttp session sized like the shared sync client."""
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=16)
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"User-Agent": USER_AGENT},
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+
+def _load_negative_cache(path: Path) -> Dict[str, list]:
+    """
+    Return the negative cache stored at path, shared by every searcher using it.
+
+    Unexpired entries are loaded on first use; changed caches are saved
+    once at exit.
+    """
+    cache = _negative_caches.get(path)
+    if cache is None:
+        try:
+            entries = json_io.load_file(path)
+        except (OSError, ValueError):
+            entries = {}
+        now = time.time()
+        cache = {url: entry for url, entry in entries.items() if entry[1] > now}
+        if not _negative_caches:
+            atexit.register(_flush_negative_caches)
+        cache = _negative_caches.setdefault(path, cache)
+    return cache
+
+
+def _flush_negative_caches():
+    """Persist every negative cache that changed."""
+    for path in list(_dirty_negative_paths):
+        try:
+            json_io.dump_file(dict(_negative_caches[path]), path, indent=False)
+            _dirty_negative_paths.discard(path)
+        except OSError:
+            pass
+
+
+def _get_session() -> Any:
+    """
+    Return the process-wide HTTP session shared by every search client.
+
+    Keeping one pooled client means repeat searches and downloads reuse
+    open TLS connections instead of handshaking per instance.
+    """
+    global _shared_session
+    if _shared_session is not None:
+        return _shared_session
+
+    if HAS_HTTPX:
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        try:
+            _shared_session = httpx.Client(http2=True, limits=limits, follow_redirects=True)
+        except ImportError:
+            # http2=True needs the optional h2 package
+            _shared_session = httpx.Client(limits=limits, follow_redirects=True)
+    else:
+        _shared_session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        _shared_session.mount("https://", adapter)
+        _shared_session.mount("http://", adapter)
+
+    _shared_session.headers.update({"User-Agent": USER_AGENT})
+    return _shared_session
+
 
 @dataclass
 class LottieAnimation:
@@ -52,15 +228,17 @@ class LottieFilesSearch:
 
     BASE_URL = "https://lottiefiles.com"
     GRAPHQL_URL = "https://graphql.lottiefiles.com/2022-08"
+    NEGATIVE_CACHE_TTL = 86400  # seconds to remember a 4xx URL
 
     def __init__(self, cache_dir: Optional[Path] = None):
         self.cache_dir = cache_dir or Path.home() / ".cache" / "lottie_search"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "Accept": "application/json",
-        })
+        self.session = _get_session()
+        self.headers = {"Accept": "application/json"}
+
+        # url -> [status, expiry timestamp] for URLs that returned 4xx
+        self._negative_path = self.cache_dir / ".negative.json"
+        self._negative_cache = _load_negative_cache(self._negative_path)
 
     def search(
         self,
@@ -83,7 +261,7 @@ class LottieFilesSearch:
         search_url = f"{self.BASE_URL}/search?q={quote_plus(query)}&category={category}"
 
         try:
-            response = self.session.get(search_url, timeout=30)
+            response = self.session.get(search_url, headers=self.headers, timeout=30)
             response.raise_for_status()
 
             # Parse animations from the page
@@ -94,22 +272,35 @@ class LottieFilesSearch:
             print(f"Search error: {e}")
             return []
 
-    def _parse_search_results(self, html: str, limit: int) -> List[LottieAnimation]:
-        """Parse animation data from search results page."""
-        animations = []
+    async def search_async(
+        self,
+        query: str,
+        limit: int = 20,
+        category: str = "animations",
+        http: Optional["aiohttp.ClientSession"] = None
+    ) -> List[LottieAnimation]:
+        """Async variant of search(); uses http (aiohttp) when given."""
+        if http is None:
+            return await asyncio.to_thread(self.search, query, limit, category)
 
-        # Look for JSON data in the page
-        # LottieFiles embeds animation data in script tags
-        json_pattern = r'"animations":\s*(\[.*?\])'
+        search_url = f"{self.BASE_URL}/search?q={quote_plus(query)}&category={category}"
 
-        # Alternative: look for individual animation cards
-        # Pattern for animation URLs
-        anim_pattern = r'href="/([a-z0-9-]+)-animation-([a-z0-9]+)"'
+        try:
+            async with http.get(search_url, headers=self.headers) as response:
+                response.raise_for_status()
+                html = await response.text()
+            return self._parse_search_results(html, limit)
 
-        # Find animation IDs from links
-        matches = re.findall(anim_pattern, html)
+        except Exception as e:
+            print(f"Search error: {e}")
+            return []
+
+    def _parse_search_results(self, html: str, limit: int) -> List[LottieAnimation]:
+        """Parse animation data from search results page."""
+        animations = []
 
-        for name_slug, anim_id in matches[:limit]:
+        # Find animation IDs from the animation card links
+        for name_slug, anim_id in self._find_animation_links(html, limit):
             # Construct the JSON URL (standard LottieFiles format)
             json_url = f"https://assets-v2.lottiefiles.com/a/{anim_id}.json"
 
@@ -130,61 +321,132 @@ class LottieFilesSearch:
 
         return animations
 
+    def _find_animation_links(self, html: str, limit: int) -> List[tuple]:
+        """Return up to limit (name_slug, anim_id) pairs from animation links."""
+        if not HAS_SELECTOLAX:
+            return _ANIM_RE.findall(html)[:limit]
+
+        matches = []
+        for node in HTMLParser(html).css('a[href*="-animation-"]'):
+            match = _ANIM_HREF_RE.fullmatch(node.attributes.get("href") or "")
+            if match:
+                matches.append(match.groups())
+                if len(matches) >= limit:
+                    break
+        return matches
+
     def search_featured(self, category: str = "featured") -> List[LottieAnimation]:
         """Get featured/popular animations."""
         url = f"{self.BASE_URL}/featured-animations"
 
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.session.get(url, headers=self.headers, timeout=30)
             return self._parse_search_results(response.text, 50)
         except:
             return []
 
     def download(self, animation: LottieAnimation) -> Optional[Path]:
         """Download animation JSON to cache."""
-        cache_path = self.cache_dir / f"{animation.id}.json"
+        return self._download_to_cache(animation.json_url, animation.id)
 
-        if cache_path.exists():
+    def download_by_url(self, url: str, name: Optional[str] = None) -> Optional[Path]:
+        """Download animation from direct URL."""
+        return self._download_to_cache(url, name or _name_from_url(url))
+
+    async def download_by_url_async(
+        self,
+        url: str,
+        name: Optional[str] = None,
+        http: Optional["aiohttp.ClientSession"] = None
+    ) -> Optional[Path]:
+        """Async variant of download_by_url(); uses http (aiohttp) when given."""
+        name = name or _name_from_url(url)
+        if http is None:
+            return await asyncio.to_thread(self._download_to_cache, url, name)
+
+        cache_path = self._cache_lookup(url, name)
+        if cache_path or self._is_known_bad(url):
             return cache_path
 
         try:
-            response = self.session.get(animation.json_url, timeout=30)
-            response.raise_for_status()
-
-            # Validate it's JSON
-            data = response.json()
+            async with http.get(url, headers=self.headers) as response:
+                self._record_status(url, response.status)
+                response.raise_for_status()
+                raw = await response.read()
+            return self._store_download(url, name, raw)
 
-            with open(cache_path, 'w') as f:
-                json.dump(data, f)
+        except Exception as e:
+            print(f"Download error for {name}: {e}")
+            return None
 
+    def _download_to_cache(self, url: str, name: str) -> Optional[Path]:
+        """Download url into the content-addressed store and link it as name."""
+        cache_path = self._cache_lookup(url, name)
+        if cache_path or self._is_known_bad(url):
             return cache_path
 
+        try:
+            response = self.session.get(url, headers=self.headers, timeout=30)
+            self._record_status(url, response.status_code)
+            response.raise_for_status()
+            return self._store_download(url, name, response.content)
+
         except Exception as e:
-            print(f"Download error for {animation.id}: {e}")
+            print(f"Download error for {name}: {e}")
             return None
 
-    def download_by_url(self, url: str, name: str = None) -> Optional[Path]:
-        """Download animation from direct URL."""
-        if not name:
-            name = url.split('/')[-1].replace('.json', '')
+    def _url_index_path(self, url: str) -> Path:
+        return self.cache_dir / "urls" / f"{_content_digest(url.encode())}.json"
+
+    def _cache_lookup(self, url: str, name: str) -> Optional[Path]:
+        """
+        Return the cached path for name, or None if url must be fetched.
 
+        Animation bytes live once under objects/<digest>.json; named entries
+        and a per-URL index are links to them. The same animation listed under
+        several names or URLs is stored (and, per URL, fetched) only once.
+        """
         cache_path = self.cache_dir / f"{name}.json"
 
         if cache_path.exists():
             return cache_path
 
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+        url_path = self._url_index_path(url)
+        if url_path.exists():
+            _link_cache_entry(cache_path, url_path.resolve())
+            return cache_path
 
-            with open(cache_path, 'w') as f:
-                json.dump(data, f)
+        return None
+
+    def _is_known_bad(self, url: str) -> bool:
+        negative = self._negative_cache.get(url)
+        return bool(negative and negative[1] > time.time())
+
+    def _record_status(self, url: str, status: int):
+        if 400 <= status < 500:
+            # Stale/forbidden URL - don't ask again until the TTL expires
+            self._negative_cache[url] = [status, time.time() + self.NEGATIVE_CACHE_TTL]
+            _dirty_negative_paths.add(self._negative_path)
+
+    def _store_download(self, url: str, name: str, raw: bytes) -> Path:
+        """Write raw bytes to the object store and link name and url to them."""
+        object_path = self.cache_dir / "objects" / f"{_content_digest(raw)}.json"
+        if not object_path.exists():
+            # Cheap sanity check instead of parsing multi-MB keyframe data
+            if not _JSON_OBJECT_START_RE.match(raw):
+                raise ValueError("response is not a JSON object")
+            object_path.parent.mkdir(exist_ok=True)
+            tmp_path = _tmp_sibling(object_path)
+            tmp_path.write_bytes(raw)
+            os.replace(tmp_path, object_path)
+
+        url_path = self._url_index_path(url)
+        url_path.parent.mkdir(exist_ok=True)
+        _link_cache_entry(url_path, object_path)
 
-            return cache_path
-        except Exception as e:
-            print(f"Download error: {e}")
-            return None
+        cache_path = self.cache_dir / f"{name}.json"
+        _link_cache_entry(cache_path, object_path)
+        return cache_path
 
 
 class IconScoutSearch:
@@ -201,7 +463,7 @@ class IconScoutSearch:
     def __init__(self, cache_dir: Optional[Path] = None):
         self.cache_dir = cache_dir or Path.home() / ".cache" / "iconscout"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.session = requests.Session()
+        self.session = _get_session()
 
     def search(self, query: str, limit: int = 20) -> List[Dict]:
         """Search IconScout for Lottie animations."""
@@ -220,8 +482,7 @@ class IconScoutSearch:
         """Parse IconScout search results."""
         results = []
         # Look for Lottie JSON URLs in the page
-        pattern = r'https://[^"]+\.json'
-        matches = re.findall(pattern, html)
+        matches = _JSON_RE.findall(html)
 
         for url in matches[:limit]:
             if 'lottie' in url.lower() or 'animation' in url.lower():
@@ -246,7 +507,7 @@ class UnifiedLottieSearch:
     # High-quality curated animations by category
     # IMPORTANT: Use assets*.lottiefiles.com/packages/* format (verified working)
     # The assets-v2.lottiefiles.com/a/* format returns 403 Forbidden
-    CURATED = {
+    CURATED: ClassVar[Dict[str, List[tuple]]] = {
         # Business & Professional
         "business": [
             ("success_checkmark", "https://assets10.lottiefiles.com/packages/lf20_jbrw3hcz.json"),
@@ -311,6 +572,12 @@ class UnifiedLottieSearch:
         ],
     }
 
+    # Result dicts per category, built once at class load (treat as read-only)
+    _CURATED_RESULTS: ClassVar[Dict[str, tuple]] = {
+        category: tuple({'name': name, 'url': url, 'source': 'curated'} for name, url in items)
+        for category, items in CURATED.items()
+    }
+
     def __init__(self, cache_dir: Optional[Path] = None):
         self.cache_dir = cache_dir or Path.home() / ".cache" / "lottie_unified"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -329,18 +596,13 @@ class UnifiedLottieSearch:
         Returns:
             List of dicts with 'name', 'url', 'source'
         """
-        results = []
+        results: List[Dict] = []
 
         # First check curated collection
         query_lower = query.lower()
-        for category, animations in self.CURATED.items():
+        for category, animations in self._CURATED_RESULTS.items():
             if query_lower in category or category in query_lower:
-                for name, url in animations:
-                    results.append({
-                        'name': name,
-                        'url': url,
-                        'source': 'curated'
-                    })
+                results.extend(animations)
 
         # Then search LottieFiles
         try:
@@ -358,77 +620,131 @@ class UnifiedLottieSearch:
 
     def get_curated(self, category: str) -> List[Dict]:
         """Get all curated animations for a category."""
-        if category in self.CURATED:
-            return [
-                {'name': name, 'url': url, 'source': 'curated'}
-                for name, url in self.CURATED[category]
-            ]
-        return []
+        return list(self._CURATED_RESULTS.get(category, ()))
 
     def list_categories(self) -> List[str]:
         """List all curated categories."""
         return list(self.CURATED.keys())
 
-    def download(self, url: str, name: str = None) -> Optional[Path]:
+    def download(self, url: str, name: Optional[str] = None) -> Optional[Path]:
         """Download animation from URL."""
         return self.lottiefiles.download_by_url(url, name)
 
+    async def download_async(
+        self,
+        url: str,
+        name: Optional[str] = None,
+        http: Optional["aiohttp.ClientSession"] = None
+    ) -> Optional[Path]:
+        """Async variant of download()."""
+        return await self.lottiefiles.download_by_url_async(url, name, http)
+
+    async def download_many_async(self, items: List[Dict]) -> List[Optional[Path]]:
+        """
+        Download several animations concurrently on the event loop.
+
+        Uses one pooled aiohttp session when aiohttp is installed, otherwise
+        each download runs in a worker thread.
+        """
+        if not HAS_AIOHTTP:
+            return list(await asyncio.gather(
+                *(self.download_async(item['url'], item.get('name')) for item in items)
+            ))
+
+        async with _aiohttp_session() as http:
+            return list(await asyncio.gather(
+                *(self.download_async(item['url'], item.get('name'), http) for item in items)
+            ))
+
+    def download_many(self, items: List[Dict], max_workers: int = 16) -> List[Optional[Path]]:
+        """
+        Download several animations concurrently.
+
+        Args:
+            items: Dicts with 'url' and optional 'name' (e.g. search or
+                find_for_concept results)
+            max_workers: Max parallel downloads when falling back to threads
+
+        Returns:
+            Cached paths in the same order as items (None for failures)
+        """
+        if not items:
+            return []
+
+        if HAS_AIOHTTP:
+            return _run_async(self.download_many_async(items))
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(
+                lambda item: self.download(item['url'], item.get('name')),
+                items
+            ))
+
+    # Common video concepts -> appropriate animation categories
+    CONCEPT_MAP: ClassVar[Dict[str, List[str]]] = {
+        # Business concepts
+        "saas": ["business", "tech", "money"],
+        "startup": ["business", "rocket", "success"],
+        "discount": ["money", "success", "arrow"],
+        "deal": ["money", "handshake", "success"],
+        "subscription": ["subscribe", "money", "arrow"],
+        "software": ["tech", "code", "loading"],
+
+        # Action concepts
+        "signup": ["subscribe", "arrow", "success"],
+        "buy": ["money", "success", "arrow"],
+        "save": ["money", "success"],
+        "join": ["subscribe", "people", "success"],
+
+        # Emotion concepts
+        "excited": ["celebration", "confetti", "success"],
+        "frustrated": ["loading", "thinking"],
+        "happy": ["celebration", "success", "people"],
+    }
+
+    # One pass over the concept finds every keyword occurrence; the lookahead
+    # lets matches overlap so each keyword is tested at every position
+    _CONCEPT_RE: ClassVar[re.Pattern] = re.compile(
+        "(?=(" + "|".join(re.escape(k) for k in sorted(CONCEPT_MAP, key=len, reverse=True)) + "))"
+    )
+
     def find_for_concept(self, concept: str) -> List[Dict]:
         """
         Find animations that match a video concept.
 
         Maps common video concepts to appropriate animation categories.
         """
-        concept_map = {
-            # Business concepts
-            "saas": ["business", "tech", "money"],
-            "startup": ["business", "rocket", "success"],
-            "discount": ["money", "success", "arrow"],
-            "deal": ["money", "handshake", "success"],
-            "subscription": ["subscribe", "money", "arrow"],
-            "software": ["tech", "code", "loading"],
-
-            # Action concepts
-            "signup": ["subscribe", "arrow", "success"],
-            "buy": ["money", "success", "arrow"],
-            "save": ["money", "success"],
-            "join": ["subscribe", "people", "success"],
-
-            # Emotion concepts
-            "excited": ["celebration", "confetti", "success"],
-            "frustrated": ["loading", "thinking"],
-            "happy": ["celebration", "success", "people"],
-        }
+        matched = set(self._CONCEPT_RE.findall(concept.lower()))
 
-        results = []
-        concept_lower = concept.lower()
+        # Keyed by URL: dedups as it accumulates and keeps first-seen order
+        by_url: Dict[str, Dict] = {}
+        # Walk CONCEPT_MAP (not match order) so results keep a stable order
+        for keyword, categories in self.CONCEPT_MAP.items():
+            if keyword not in matched:
+                continue
+            for cat in categories:
+                for r in self._CURATED_RESULTS.get(cat, ()):
+                    by_url.setdefault(r['url'], r)
 
-        for keyword, categories in concept_map.items():
-            if keyword in concept_lower:
-                for cat in categories:
-                    results.extend(self.get_curated(cat))
+        return list(by_url.values())
 
-        # Deduplicate
-        seen = set()
-        unique = []
-        for r in results:
-            if r['url'] not in seen:
-                seen.add(r['url'])
-                unique.append(r)
 
-        return unique
+def _get_default_search() -> "UnifiedLottieSearch":
+    """Return the UnifiedLottieSearch reused by the convenience functions."""
+    global _default_search
+    if _default_search is None:
+        _default_search = UnifiedLottieSearch()
+    return _default_search
 
 
 def search_animations(query: str, limit: int = 20) -> List[Dict]:
     """Convenience function to search for animations."""
-    search = UnifiedLottieSearch()
-    return search.search(query, limit)
+    return _get_default_search().search(query, limit)
 
 
-def download_animation(url: str, name: str = None) -> Optional[Path]:
+def download_animation(url: str, name: Optional[str] = None) -> Optional[Path]:
     """Convenience function to download an animation."""
-    search = UnifiedLottieSearch()
-    return search.download(url, name)
+    return _get_default_search().download(url, name)
 
 
 if __name__ == "__main__":
@@ -15,17 +15,257 @@ Reference: https://github.com/laggykiller/rlottie-python
 """
 
 import os
+import sys
 import json
 import subprocess
+import hashlib
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple, Union
-from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple, Union, Callable
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import shutil
 
+# zlib level for intermediate PNGs only read back by ffmpeg (PIL default is 6)
+PNG_COMPRESS_LEVEL = 1
+
+# Below this many frames per worker, process startup outweighs the parallelism
+MIN_FRAMES_PER_SHARD = 16
+
+# Timeline sharding for composite_overlays_parallel: each shard is a full
+# ffmpeg encode, so keep them few and long enough to amortize startup
+MAX_TIME_SHARDS = 8
+MIN_SHARD_SECONDS = 10.0
+
+# ffmpeg stderr is drained through a large pipe buffer; only this many
+# trailing (error-level) lines are kept for error messages
+FFMPEG_PIPE_BUFSIZE = 1 << 20
+FFMPEG_STDERR_LINES = 200
+
+# libvpx-vp9 is single-threaded and slowest-quality by default; overlay
+# animations don't need archival quality
+VP9_SPEED_ARGS = [
+    "-row-mt", "1",
+    "-tile-columns", "2",
+    "-threads", str(os.cpu_count() or 4),
+    "-cpu-used", "4",
+    "-deadline", "good",
+    "-lag-in-frames", "0",
+]
+
+# rlottie renders Lottie frames in-process; puppeteer-lottie is the fallback
+try:
+    import rlottie_python
+    HAS_RLOTTIE = True
+except ImportError:
+    HAS_RLOTTIE = False
+
+# PyAV probes media in-process instead of spawning ffprobe
+try:
+    import av
+    HAS_AV = True
+except ImportError:
+    HAS_AV = False
+
+# In-process SVG rasterizers, tried before forking rsvg-convert/ImageMagick.
+# cairosvg raises OSError at import when the cairo library is missing.
+try:
+    import cairosvg
+    HAS_CAIROSVG = True
+except (ImportError, OSError):
+    HAS_CAIROSVG = False
+
+try:
+    import resvg_py
+    HAS_RESVG = True
+except ImportError:
+    HAS_RESVG = False
+
+# H.264 encoders for the final composite, in order of preference.
+# Set MOTION_GRAPHICS_ENCODER (e.g. "libx264") to force one.
+H264_ENCODER_ARGS = {
+    "h264_nvenc": ["-c:v", "h264_nvenc", "-preset", "p4", "-cq", "23"],
+    "h264_qsv": ["-c:v", "h264_qsv", "-global_quality", "23"],
+    "h264_videotoolbox": ["-c:v", "h264_videotoolbox", "-q:v", "65"],
+    "h264_vaapi": ["-c:v", "h264_vaapi", "-qp", "23"],
+    "libx264": ["-c:v", "libx264", "-preset", "fast", "-crf", "23"],
+}
+VAAPI_DEVICE = "/dev/dri/renderD128"
+
+_h264_encoder: Optional[str] = None
+_h264_encoder_lock = threading.Lock()
+_cuda_overlay: Optional[bool] = None
+
+
+def detect_h264_encoder() -> str:
+    """
+    Pick the fastest working H.264 encoder (checked once per process).
+
+    An encoder listed by `ffmpeg -encoders` may still lack a usable GPU,
+    so each candidate is confirmed with a one-frame test encode.
+    """
+    global _h264_encoder
+    if _h264_encoder is not None:
+        return _h264_encoder
+
+    # Concurrent callers wait for detection rather than seeing a provisional
+    # libx264, so a batch never mixes encoders
+    with _h264_encoder_lock:
+        if _h264_encoder is None:
+            _h264_encoder = _probe_h264_encoder()
+    return _h264_encoder
+
+
+def _probe_h264_encoder() -> str:
+    """Run the encoder checks for detect_h264_encoder (call it under the lock)."""
+    forced = os.environ.get("MOTION_GRAPHICS_ENCODER")
+    if forced:
+        return forced
+
+    try:
+        listed = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True
+        ).stdout
+    except OSError:
+        return "libx264"
+
+    for name in H264_ENCODER_ARGS:
+        if name == "libx264" or f" {name} " not in listed:
+            continue
+        cmd = ["ffmpeg", "-hide_banner", "-v", "error"]
+        if name == "h264_vaapi":
+            cmd.extend(["-vaapi_device", VAAPI_DEVICE])
+        cmd.extend(["-f", "lavfi", "-i", "color=black:s=256x256", "-frames:v", "1"])
+        if name == "h264_vaapi":
+            cmd.extend(["-vf", "format=nv12,hwupload"])
+        cmd.extend(H264_ENCODER_ARGS[name] + ["-f", "null", "-"])
+        if subprocess.run(cmd, capture_output=True).returncode == 0:
+            return name
+
+    return "libx264"
+
+
+def has_cuda_overlay() -> bool:
+    """Whether this ffmpeg build has the overlay_cuda filter (checked once)."""
+    global _cuda_overlay
+    if _cuda_overlay is None:
+        try:
+            filters = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True
+            ).stdout
+            _cuda_overlay = " overlay_cuda " in filters and " hwupload_cuda " in filters
+        except OSError:
+            _cuda_overlay = False
+    return _cuda_overlay
+
+
+def h264_encoder_args(video_height: int, encoder: Optional[str] = None) -> List[str]:
+    """
+    Video encoder arguments for H.264 output.
+
+    Defaults to the detected encoder. VAAPI only encodes GPU surfaces
+    (hwupload in the filtergraph), so it is swapped for libx264 unless
+    passed explicitly. For libx264, threads and preset follow the
+    resolution: x264 frame threading stops scaling past ~16 threads, and
+    below 720p veryfast looks the same as fast at about twice the speed.
+    """
+    if encoder is None:
+        encoder = detect_h264_encoder()
+        if encoder == "h264_vaapi":
+            encoder = "libx264"
+
+    if encoder != "libx264":
+        return H264_ENCODER_ARGS.get(encoder, ["-c:v", encoder])
+
+    if video_height <= 480:
+        threads = 4
+    elif video_height <= 720:
+        threads = 8
+    else:
+        threads = 16
+    threads = min(os.cpu_count() or 4, threads)
+    preset = "veryfast" if video_height < 720 else "fast"
+
+    return [
+        "-c:v", "libx264", "-preset", preset, "-crf", "23",
+        "-threads", str(threads),
+        "-x264-params", f"threads={threads}:sliced-threads=0:lookahead-threads=2"
+    ]
+
+
+def _feed_stdin(stdin, data: bytes):
+    try:
+        stdin.write(data)
+        stdin.close()
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its stderr says why
+
+
+def run_ffmpeg(
+    cmd: List[str],
+    duration: Optional[float] = None,
+    input_text: Optional[str] = None
+) -> Tuple[int, str]:
+    """
+    Run an ffmpeg command and return (returncode, last stderr lines).
 
-class OverlayPosition(Enum):
+    Only error-level stderr is requested, its tail kept and decoded when
+    the command fails. With a known output duration, progress is read from
+    -progress on stdout (stderr drained on a second thread so neither pipe
+    stalls the encode) and printed every 10%. input_text, if given, is
+    written to ffmpeg's stdin (for "-i pipe:0").
+    """
+    progress = ["-progress", "pipe:1"] if duration else []
+    cmd = cmd[:1] + progress + ["-nostats", "-loglevel", "error"] + cmd[1:]
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE if duration else subprocess.DEVNULL,
+        stderr=subprocess.PIPE, bufsize=FFMPEG_PIPE_BUFSIZE
+    )
+    if input_text is not None:
+        threading.Thread(
+            target=_feed_stdin, args=(proc.stdin, input_text.encode()), daemon=True
+        ).start()
+
+    tail = deque(maxlen=FFMPEG_STDERR_LINES)
+    if not duration:
+        tail.extend(proc.stderr)
+    else:
+        drain = threading.Thread(target=tail.extend, args=(proc.stderr,), daemon=True)
+        drain.start()
+        reported = 0
+        for line in proc.stdout:
+            # out_time_ms is in microseconds despite its name
+            if not line.startswith(b"out_time_ms="):
+                continue
+            try:
+                percent = int(int(line[12:]) / 1e6 / duration * 100)
+            except ValueError:
+                continue
+            if percent >= reported + 10 and percent < 100:
+                reported = percent - percent % 10
+                print(f"  {reported}%")
+        drain.join()
+
+    returncode = proc.wait()
+    if returncode == 0:
+        return returncode, ""
+    return returncode, b"".join(tail).decode(errors="replace")
+
+
+# Pillow reads PNG headers without spawning ffprobe
+try:
+    from PIL import Image, ImageColor, ImageDraw, ImageFont
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+
+class OverlayPosition(str, Enum):
     """Predefined overlay positions for common motion graphics placements."""
     # Lower thirds (bottom area)
     LOWER_THIRD_LEFT = "lower_third_left"
@@ -57,7 +297,7 @@ class OverlayPosition(Enum):
     CUSTOM = "custom"
 
 
-class OverlayType(Enum):
+class OverlayType(str, Enum):
     """Types of motion graphics overlays."""
     # Standard overlays
     LOWER_THIRD = "lower_third"     # Name/title graphic
@@ -98,6 +338,7 @@ class OverlayConfig:
     y_offset: int = 0                      # Vertical offset from position
     custom_x: Optional[int] = None         # For CUSTOM position
     custom_y: Optional[int] = None         # For CUSTOM position
+    source_size: Optional[Tuple[int, int]] = None  # Known (w, h) of source, skips a probe
 
 
 @dataclass
@@ -107,9 +348,44 @@ class MotionGraphicsResult:
     output_path: Optional[Path] = None
     duration: float = 0.0
     overlays_applied: int = 0
+    base_filter_applied: bool = False
     error: Optional[str] = None
 
 
+def _render_lottie_shard(
+    lottie_path: Path,
+    frame_nums: range,
+    base_index: int,
+    width: int,
+    height: int,
+    output_dir: Path
+) -> int:
+    """
+    Render frame_nums of a Lottie animation to PNGs, numbered from base_index.
+
+    Runs in a worker process, so it loads its own LottieAnimation.
+    Returns the number of frames written.
+    """
+    from rlottie_python import LottieAnimation
+
+    anim = LottieAnimation.from_file(str(lottie_path))
+
+    for k, frame_num in enumerate(frame_nums):
+        # Render frame to buffer
+        buffer = anim.lottie_animation_render(frame_num=frame_num, width=width, height=height)
+
+        # Convert to PIL Image (BGRA -> RGBA). PIL's raw unpacker swaps
+        # channels in one C pass - faster than a NumPy channel gather
+        img = Image.frombuffer("RGBA", (width, height), buffer, "raw", "BGRA")
+
+        # Save with transparency; frames are only read back by ffmpeg,
+        # so trade a little size for much faster zlib
+        frame_path = output_dir / f"frame_{base_index + k:04d}.png"
+        img.save(frame_path, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+
+    return len(frame_nums)
+
+
 class LottieRenderer:
     """
     Renders Lottie animations to PNG sequences with transparency.
@@ -125,21 +401,9 @@ class LottieRenderer:
 
     def _check_dependencies(self):
         """Check for available rendering backends."""
-        self.has_rlottie = False
-        self.has_puppeteer = False
-
-        try:
-            import rlottie_python
-            self.has_rlottie = True
-        except ImportError:
-            pass
-
-        # Check for puppeteer-lottie-cli
-        result = subprocess.run(
-            ["which", "puppeteer-lottie"],
-            capture_output=True, text=True
-        )
-        self.has_puppeteer = result.returncode == 0
+        self.has_rlottie = HAS_RLOTTIE
+        # PATH lookup in-process rather than forking `which`
+        self.has_puppeteer = shutil.which("puppeteer-lottie") is not None
 
     def render_to_frames(
         self,
@@ -182,7 +446,6 @@ class LottieRenderer:
         """Render using rlottie-python."""
         try:
             from rlottie_python import LottieAnimation
-            from PIL import Image
 
             # Load animation
             anim = LottieAnimation.from_file(str(lottie_path))
@@ -202,19 +465,132 @@ class LottieRenderer:
             # Calculate frame step for target fps
             frame_step = max(1, int(anim_fps / fps))
 
-            # Render frames
-            frame_count = 0
-            for i in range(0, total_frames, frame_step):
-                # Render frame to buffer
-                buffer = anim.lottie_animation_render(frame_num=i, width=width, height=height)
+            # Render frames: shard the frame range across processes, each
+            # loading its own animation (one rlottie object can't render
+            # concurrently, independent ones can)
+            frame_nums = range(0, total_frames, frame_step)
+            workers = min(os.cpu_count() or 1, len(frame_nums) // MIN_FRAMES_PER_SHARD)
+            if workers <= 1:
+                frame_count = _render_lottie_shard(
+                    lottie_path, frame_nums, 0, width, height, output_dir
+                )
+            else:
+                shard_size = -(-len(frame_nums) // workers)  # ceil
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(
+                            _render_lottie_shard,
+                            lottie_path,
+                            frame_nums[start:start + shard_size],
+                            start,
+                            width,
+                            height,
+                            output_dir
+                        )
+                        for start in range(0, len(frame_nums), shard_size)
+                    ]
+                    frame_count = sum(f.result() for f in futures)
 
-                # Convert to PIL Image (BGRA -> RGBA)
-                img = Image.frombuffer("RGBA", (width, height), buffer, "raw", "BGRA")
+            return {
+                "success": True,
+                "frame_count": frame_count,
+                "duration": duration,
+                "fps": fps,
+                "width": width,
+                "height": height,
+                "frame_pattern": str(output_dir / "frame_%04d.png")
+            }
+
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def render_to_webm(
+        self,
+        lottie_path: Path,
+        output_path: Path,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fps: int = 30,
+        crf: int = 30
+    ) -> Dict[str, Any]:
+        """
+        Render Lottie animation straight to WebM VP9 with alpha.
 
-                # Save with transparency
-                frame_path = output_dir / f"frame_{frame_count:04d}.png"
-                img.save(frame_path, "PNG")
-                frame_count += 1
+        rlottie's BGRA buffers are piped to a single ffmpeg process as raw
+        video, skipping the PNG encode, disk round-trip and re-decode of
+        render_to_frames + frames_to_webm. Falls back to that path when
+        only puppeteer-lottie is available.
+
+        Returns:
+            Dict with success, frame_count, duration, output_path
+        """
+        if not self.has_rlottie:
+            frames_dir = self.temp_dir / f"lottie_frames_{lottie_path.stem}"
+            try:
+                result = self.render_to_frames(lottie_path, frames_dir, width, height, fps)
+                if not result.get("success"):
+                    return result
+                if not self.frames_to_webm(result["frame_pattern"], output_path, fps=fps, crf=crf):
+                    return {"success": False, "error": "WebM encoding failed"}
+            finally:
+                # The PNGs are only an intermediate for the WebM
+                shutil.rmtree(frames_dir, ignore_errors=True)
+            return {**result, "output_path": str(output_path)}
+
+        try:
+            from rlottie_python import LottieAnimation
+
+            anim = LottieAnimation.from_file(str(lottie_path))
+
+            total_frames = anim.lottie_animation_get_totalframe()
+            anim_fps = anim.lottie_animation_get_framerate()
+            duration = anim.lottie_animation_get_duration()
+            anim_width, anim_height = anim.lottie_animation_get_size()
+
+            # Use animation dimensions if not specified
+            if width is None:
+                width = anim_width
+            if height is None:
+                height = anim_height
+
+            # Calculate frame step for target fps
+            frame_step = max(1, int(anim_fps / fps))
+
+            cmd = [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "rawvideo",
+                "-pix_fmt", "bgra",  # rlottie's native layout, no conversion
+                "-s", f"{width}x{height}",
+                "-framerate", str(fps),
+                "-i", "-",
+                "-c:v", "libvpx-vp9",
+                "-pix_fmt", "yuva420p",  # Alpha channel support
+                "-crf", str(crf),
+                "-b:v", "0",
+                "-auto-alt-ref", "0",
+                *VP9_SPEED_ARGS,
+                str(output_path)
+            ]
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+            )
+
+            frame_count = 0
+            try:
+                for i in range(0, total_frames, frame_step):
+                    proc.stdin.write(
+                        anim.lottie_animation_render(frame_num=i, width=width, height=height)
+                    )
+                    frame_count += 1
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its stderr says why
+            finally:
+                proc.stdin.close()
+                stderr = proc.stderr.read().decode(errors="replace")
+                proc.wait()
+
+            if proc.returncode != 0:
+                return {"success": False, "error": stderr[:500]}
 
             return {
                 "success": True,
@@ -223,7 +599,7 @@ class LottieRenderer:
                 "fps": fps,
                 "width": width,
                 "height": height,
-                "frame_pattern": str(output_dir / "frame_%04d.png")
+                "output_path": str(output_path)
             }
 
         except Exception as e:
@@ -284,11 +660,64 @@ class LottieRenderer:
             "-crf", str(crf),
             "-b:v", "0",
             "-auto-alt-ref", "0",
+            *VP9_SPEED_ARGS,
             str(output_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.returncode == 0
+        returncode, _ = run_ffmpeg(cmd)
+        return returncode == 0
+
+
+# filter_complex segment templates for one overlay, bound per overlay by
+# MotionGraphicsCompositor._overlay_filter. Labels chain segments together.
+_FADES_TMPL = (
+    ",fade=t=in:st=0:d={fade_in}:alpha=1"
+    ",fade=t=out:st={fade_out_start}:d={fade_out}:alpha=1"
+)
+_ENABLE_TMPL = ":enable='between(t,{start},{end})'"
+
+# Static PNG: looped on input (-loop 1 -t duration)
+_PNG_OVERLAY_TMPL = (
+    "[{idx}:v]format=rgba{fades}{upload}[{ov}];"
+    "[{base}][{ov}]{overlay}={x}:{y}{enable}[{out}]"
+)
+
+# WebM/video with alpha - CRITICAL: video must continue after overlay ends
+#
+# Key approach:
+# 1. Loop overlay infinitely (-stream_loop -1) so it never runs out
+# 2. Trim overlay to exact duration in filter graph
+# 3. Use eof_action=pass so main video continues if overlay somehow ends
+# 4. Use enable='between(...)' to control visibility timing
+# 5. NO -shortest flag or shortest=1 option
+_VIDEO_OVERLAY_TMPL = (
+    # Process overlay: format, trim to duration, reset PTS, add fades
+    "[{idx}:v]format=rgba,trim=duration={duration},setpts=PTS-STARTPTS{fades}{upload}[{ov}];"
+    # Composite: main video continues, overlay appears during window
+    "[{base}][{ov}]{overlay}={x}:{y}:eof_action=pass"
+    ":enable='between(t,{start},{end})'[{out}]"
+)
+
+# (x, y) per OverlayPosition, from
+# (video_w, video_h, overlay_w, overlay_h, margin_x, margin_y, lower_third_y)
+_POSITION_FORMULAE: Dict[OverlayPosition, Callable[..., Tuple[int, int]]] = {
+    OverlayPosition.TOP_LEFT: lambda vw, vh, w, h, mx, my, lt: (mx, my),
+    OverlayPosition.TOP_RIGHT: lambda vw, vh, w, h, mx, my, lt: (vw - w - mx, my),
+    OverlayPosition.TOP_CENTER: lambda vw, vh, w, h, mx, my, lt: ((vw - w) // 2, my),
+    OverlayPosition.BOTTOM_LEFT: lambda vw, vh, w, h, mx, my, lt: (mx, vh - h - my),
+    OverlayPosition.BOTTOM_RIGHT: lambda vw, vh, w, h, mx, my, lt: (vw - w - mx, vh - h - my),
+    OverlayPosition.BOTTOM_CENTER: lambda vw, vh, w, h, mx, my, lt: ((vw - w) // 2, vh - h - my),
+    OverlayPosition.CENTER: lambda vw, vh, w, h, mx, my, lt: ((vw - w) // 2, (vh - h) // 2),
+    OverlayPosition.LOWER_THIRD_LEFT: lambda vw, vh, w, h, mx, my, lt: (mx, lt - h),
+    OverlayPosition.LOWER_THIRD_CENTER: lambda vw, vh, w, h, mx, my, lt: ((vw - w) // 2, lt - h),
+    OverlayPosition.LOWER_THIRD_RIGHT: lambda vw, vh, w, h, mx, my, lt: (vw - w - mx, lt - h),
+    OverlayPosition.FULLSCREEN: lambda vw, vh, w, h, mx, my, lt: (0, 0),
+}
+
+
+def _default_position(vw, vh, w, h, mx, my, lt) -> Tuple[int, int]:
+    """Bottom-left within the safe margins"""
+    return mx, vh - h - my
 
 
 class MotionGraphicsCompositor:
@@ -308,28 +737,69 @@ class MotionGraphicsCompositor:
     # Lower third positioning (percentage from bottom)
     LOWER_THIRD_Y = 0.15  # 15% from bottom
 
-    def __init__(self, temp_dir: Optional[Path] = None):
+    def __init__(self, temp_dir: Optional[Path] = None, cache_dir: Optional[Path] = None):
         self.temp_dir = temp_dir or Path(tempfile.mkdtemp())
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        # Rendered Lottie WebMs / rasterized SVGs, reused across runs
+        self.cache_dir = cache_dir or Path.home() / ".cache" / "motion_graphics"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.lottie_renderer = LottieRenderer(self.temp_dir)
+        self.h264_encoder = detect_h264_encoder()
+        # (resolved path, mtime, size) -> probe dict, so each file is probed once
+        self._probe_cache: Dict[Tuple[Path, int, int], Dict[str, Any]] = {}
+
+    def _probe(self, path: Path) -> Dict[str, Any]:
+        """
+        Probe width, height, pix_fmt and duration with one ffprobe call.
+
+        Uses PyAV in-process when installed. Results are cached per file
+        version; missing fields are left out.
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return {}
+        key = (path.resolve(), stat.st_mtime_ns, stat.st_size)
+        if key in self._probe_cache:
+            return self._probe_cache[key]
+
+        if HAS_AV:
+            info = _av_probe(path)
+            if info is not None:
+                self._probe_cache[key] = info
+                return info
 
-    def get_video_dimensions(self, video_path: Path) -> Tuple[int, int]:
-        """Get video width and height."""
         cmd = [
             "ffprobe", "-v", "error",
             "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
+            "-show_entries", "stream=width,height,pix_fmt:format=duration",
             "-of", "json",
-            str(video_path)
+            str(path)
         ]
         result = subprocess.run(cmd, capture_output=True, text=True)
 
+        info: Dict[str, Any] = {}
         try:
             data = json.loads(result.stdout)
-            stream = data["streams"][0]
-            return stream["width"], stream["height"]
+            if data.get("streams"):
+                stream = data["streams"][0]
+                info["width"] = stream["width"]
+                info["height"] = stream["height"]
+                info["pix_fmt"] = stream.get("pix_fmt")
+            if data.get("format", {}).get("duration"):
+                info["duration"] = float(data["format"]["duration"])
         except:
-            return 1920, 1080  # Default HD
+            pass
+
+        self._probe_cache[key] = info
+        return info
+
+    def get_video_dimensions(self, video_path: Path) -> Tuple[int, int]:
+        """Get video width and height."""
+        info = self._probe(video_path)
+        if "width" in info:
+            return info["width"], info["height"]
+        return 1920, 1080  # Default HD
 
     def calculate_position(
         self,
@@ -355,54 +825,12 @@ class MotionGraphicsCompositor:
         if pos == OverlayPosition.CUSTOM:
             x = overlay_config.custom_x or 0
             y = overlay_config.custom_y or 0
-
-        elif pos == OverlayPosition.TOP_LEFT:
-            x = margin_x
-            y = margin_y
-
-        elif pos == OverlayPosition.TOP_RIGHT:
-            x = video_width - scaled_width - margin_x
-            y = margin_y
-
-        elif pos == OverlayPosition.TOP_CENTER:
-            x = (video_width - scaled_width) // 2
-            y = margin_y
-
-        elif pos == OverlayPosition.BOTTOM_LEFT:
-            x = margin_x
-            y = video_height - scaled_height - margin_y
-
-        elif pos == OverlayPosition.BOTTOM_RIGHT:
-            x = video_width - scaled_width - margin_x
-            y = video_height - scaled_height - margin_y
-
-        elif pos == OverlayPosition.BOTTOM_CENTER:
-            x = (video_width - scaled_width) // 2
-            y = video_height - scaled_height - margin_y
-
-        elif pos == OverlayPosition.CENTER:
-            x = (video_width - scaled_width) // 2
-            y = (video_height - scaled_height) // 2
-
-        elif pos == OverlayPosition.LOWER_THIRD_LEFT:
-            x = margin_x
-            y = int(video_height * (1 - self.LOWER_THIRD_Y)) - scaled_height
-
-        elif pos == OverlayPosition.LOWER_THIRD_CENTER:
-            x = (video_width - scaled_width) // 2
-            y = int(video_height * (1 - self.LOWER_THIRD_Y)) - scaled_height
-
-        elif pos == OverlayPosition.LOWER_THIRD_RIGHT:
-            x = video_width - scaled_width - margin_x
-            y = int(video_height * (1 - self.LOWER_THIRD_Y)) - scaled_height
-
-        elif pos == OverlayPosition.FULLSCREEN:
-            x = 0
-            y = 0
-
         else:
-            x = margin_x
-            y = video_height - scaled_height - margin_y
+            lower_third_y = int(video_height * (1 - self.LOWER_THIRD_Y))
+            x, y = _POSITION_FORMULAE.get(pos, _default_position)(
+                video_width, video_height, scaled_width, scaled_height,
+                margin_x, margin_y, lower_third_y
+            )
 
         # Apply offsets
         x += overlay_config.x_offset
@@ -410,6 +838,31 @@ class MotionGraphicsCompositor:
 
         return x, y
 
+    def _cached_asset_path(self, source: Path, target_width: int, suffix: str) -> Path:
+        """Cache path keyed by source content and render size."""
+        digest = hashlib.blake2b(source.read_bytes(), digest_size=8).hexdigest()
+        return self.cache_dir / f"{digest}_{target_width}{suffix}"
+
+    def _rasterize_svg(self, source: Path, png_path: Path, target_width: int) -> bool:
+        """Rasterize an SVG in-process (cairosvg, then resvg). False if neither works."""
+        if HAS_CAIROSVG:
+            try:
+                cairosvg.svg2png(url=str(source), write_to=str(png_path), output_width=target_width)
+                return True
+            except Exception:
+                pass
+
+        if HAS_RESVG:
+            try:
+                png_bytes = resvg_py.svg_to_bytes(svg_path=str(source), width=target_width)
+                if isinstance(png_bytes, bytes):
+                    png_path.write_bytes(png_bytes)
+                    return True
+            except Exception:
+                pass
+
+        return False
+
     def prepare_overlay(
         self,
         config: OverlayConfig,
@@ -423,39 +876,45 @@ class MotionGraphicsCompositor:
         - PNG: Use directly
         - SVG: Rasterize to PNG
         - WebM: Use directly if VP9 with alpha
+
+        Rendered Lottie and SVG assets are cached by content and size, so
+        a template reused across overlays or runs is rendered once.
         """
         source = config.source
         suffix = source.suffix.lower()
 
         if suffix == ".json":
-            # Lottie animation - render to WebM
-            frames_dir = self.temp_dir / f"lottie_frames_{source.stem}"
-
+            # Lottie animation - render to WebM with alpha
             # Determine target size (scale relative to video)
             target_width = int(video_width * 0.3 * config.scale)  # 30% of video width
+            webm_path = self._cached_asset_path(source, target_width, ".webm")
+            if webm_path.exists():
+                return webm_path
 
-            result = self.lottie_renderer.render_to_frames(
-                source, frames_dir, width=target_width
+            # Render beside the cache entry, then rename so it's never partial
+            tmp_path = webm_path.with_name(f".{os.getpid()}_{threading.get_ident()}_{webm_path.name}")
+            result = self.lottie_renderer.render_to_webm(
+                source, tmp_path, width=target_width
             )
 
             if not result.get("success"):
+                tmp_path.unlink(missing_ok=True)
                 print(f"    Failed to render Lottie: {result.get('error')}")
                 return None
-
-            # Convert to WebM with alpha
-            webm_path = self.temp_dir / f"{source.stem}.webm"
-            if self.lottie_renderer.frames_to_webm(
-                result["frame_pattern"],
-                webm_path,
-                fps=result.get("fps", 30)
-            ):
-                return webm_path
-            return None
+            os.replace(tmp_path, webm_path)
+            return webm_path
 
         elif suffix == ".svg":
             # SVG - rasterize to PNG with transparency
-            png_path = self.temp_dir / f"{source.stem}.png"
             target_width = int(video_width * 0.2 * config.scale)
+            cached_path = self._cached_asset_path(source, target_width, ".png")
+            if cached_path.exists():
+                return cached_path
+            png_path = cached_path.with_name(f".{os.getpid()}_{threading.get_ident()}_{cached_path.name}")
+
+            if self._rasterize_svg(source, png_path, target_width):
+                os.replace(png_path, cached_path)
+                return cached_path
 
             # Use rsvg-convert or ImageMagick
             cmd = [
@@ -478,7 +937,10 @@ class MotionGraphicsCompositor:
                 ]
                 result = subprocess.run(cmd, capture_output=True, text=True)
 
-            return png_path if png_path.exists() else None
+            if not png_path.exists():
+                return None
+            os.replace(png_path, cached_path)
+            return cached_path
 
         elif suffix in [".png", ".webm"]:
             # Already in usable format
@@ -486,128 +948,256 @@ class MotionGraphicsCompositor:
 
         return None
 
-    def composite_single_overlay(
+    def get_overlay_dimensions(self, overlay_path: Path) -> Tuple[int, int]:
+        """Get overlay width and height (WebM or PNG)."""
+        if overlay_path.suffix == ".webm":
+            return self.get_video_dimensions(overlay_path)
+
+        if overlay_path.suffix.lower() == ".png":
+            size = read_png_size(overlay_path)
+            if size:
+                return size
+
+        # Other images - read the header with Pillow when available
+        if HAS_PIL:
+            try:
+                with Image.open(overlay_path) as img:
+                    return img.size
+            except OSError:
+                pass
+
+        info = self._probe(overlay_path)
+        if "width" in info:
+            return info["width"], info["height"]
+        return 400, 200
+
+    def _overlay_input_args(self, overlay_path: Path, config: OverlayConfig) -> List[str]:
+        """ffmpeg input arguments for one overlay."""
+        if overlay_path.suffix == ".png":
+            # For static PNG, we need to loop it
+            return ["-loop", "1", "-t", str(config.timing.duration), "-i", str(overlay_path)]
+
+        return [
+            "-stream_loop", "-1",              # Loop overlay infinitely
+            "-c:v", "libvpx-vp9",              # VP9 decoder for alpha
+            "-i", str(overlay_path)
+        ]
+
+    def _overlay_filter(
         self,
-        video_path: Path,
         overlay_path: Path,
         config: OverlayConfig,
-        output_path: Path
-    ) -> bool:
+        input_index: int,
+        base_label: str,
+        out_label: str,
+        position: Tuple[int, int],
+        cuda: bool = False
+    ) -> str:
         """
-        Composite a single overlay onto video.
+        filter_complex segment compositing input input_index onto base_label.
 
-        Handles timing, position, opacity, and fade effects.
+        Segments chain through their labels, so several overlays can be
+        applied in one ffmpeg pass. With cuda, the (small) overlay is faded
+        on the CPU, then uploaded and blended onto the GPU-resident main
+        video with overlay_cuda.
         """
-        video_width, video_height = self.get_video_dimensions(video_path)
+        timing = config.timing
+        x, y = position
+        params = {
+            "idx": input_index,
+            "ov": f"ov{input_index}",
+            "base": base_label,
+            "out": out_label,
+            "x": x,
+            "y": y,
+            "start": timing.start_time,
+            "end": timing.end_time,
+            "duration": timing.duration,
+            "overlay": "overlay_cuda" if cuda else "overlay",
+            "upload": ",format=yuva420p,hwupload_cuda" if cuda else "",
+            "fades": "",
+            "enable": "",
+        }
 
-        # Get overlay dimensions
-        if overlay_path.suffix == ".webm":
-            ov_width, ov_height = self.get_video_dimensions(overlay_path)
-        else:
-            # PNG - probe dimensions
-            cmd = [
-                "ffprobe", "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height",
-                "-of", "json",
-                str(overlay_path)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            try:
-                data = json.loads(result.stdout)
-                ov_width = data["streams"][0]["width"]
-                ov_height = data["streams"][0]["height"]
-            except:
-                ov_width, ov_height = 400, 200
+        # Zero-length fades are no-ops, so leave the filters out entirely
+        if timing.fade_in > 0 or timing.fade_out > 0:
+            params["fades"] = _FADES_TMPL.format(
+                fade_in=timing.fade_in,
+                fade_out=timing.fade_out,
+                fade_out_start=timing.duration - timing.fade_out
+            )
 
-        # Calculate position
-        x, y = self.calculate_position(config, video_width, video_height, ov_width, ov_height)
+        if overlay_path.suffix == ".png":
+            # Add enable condition for timing
+            if timing.start_time > 0 or timing.duration > 0:
+                params["enable"] = _ENABLE_TMPL.format_map(params)
+            return _PNG_OVERLAY_TMPL.format_map(params)
 
-        # Build ffmpeg command
-        timing = config.timing
+        return _VIDEO_OVERLAY_TMPL.format_map(params)
+
+    def _encoder_args(self, encoder: str, video_height: int) -> List[str]:
+        """Video encoder arguments for the composite pass."""
+        return h264_encoder_args(video_height, encoder)
 
-        # Build filter for timing and fades
-        overlay_filter = f"overlay={x}:{y}"
+    def _run_composite(
+        self,
+        video_path: Path,
+        prepared: List[Tuple[Path, OverlayConfig]],
+        output_path: Path,
+        video_size: Optional[Tuple[int, int]] = None,
+        base_filter: Optional[str] = None
+    ) -> bool:
+        """
+        Composite prepared overlays onto video with a single ffmpeg pass.
 
-        # Add enable condition for timing
-        if timing.start_time > 0 or timing.duration > 0:
-            overlay_filter += f":enable='between(t,{timing.start_time},{timing.end_time})'"
+        Overlays are chained in one filter_complex, so the main video is
+        decoded and encoded once no matter how many overlays there are.
+        base_filter (e.g. a drawtext chain) runs on the main video first.
+        """
+        video_width, video_height = video_size or self.get_video_dimensions(video_path)
+        encoder = self.h264_encoder
+
+        # With NVENC, keep frames in VRAM from decode through overlay to encode.
+        # CPU-only filters like drawtext can't run on CUDA frames.
+        if encoder == "h264_nvenc" and has_cuda_overlay() and not base_filter:
+            if self._composite_pass(video_path, prepared, output_path, video_width, video_height, cuda=True):
+                return True
+            print("    CUDA composite failed, retrying on CPU...")
+
+        return self._composite_pass(
+            video_path, prepared, output_path, video_width, video_height, base_filter=base_filter
+        )
 
-        # For static PNG, we need to loop it
-        if overlay_path.suffix == ".png":
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", str(video_path),
-                "-loop", "1", "-t", str(timing.duration),
-                "-i", str(overlay_path),
-                "-filter_complex",
-                f"[1:v]format=rgba,fade=t=in:st=0:d={timing.fade_in}:alpha=1,"
-                f"fade=t=out:st={timing.duration - timing.fade_out}:d={timing.fade_out}:alpha=1[ov];"
-                f"[0:v][ov]{overlay_filter}",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                "-c:a", "copy",
-                str(output_path)
-            ]
-        else:
-            # WebM/video with alpha - CRITICAL: video must continue after overlay ends
-            #
-            # Key approach:
-            # 1. Loop overlay infinitely (-stream_loop -1) so it never runs out
-            # 2. Trim overlay to exact duration in filter graph
-            # 3. Use eof_action=pass so main video continues if overlay somehow ends
-            # 4. Use enable='between(...)' to control visibility timing
-            # 5. NO -shortest flag or shortest=1 option
-
-            # Build overlay filter with:
-            # - x,y position
-            # - eof_action=pass (continue main video if overlay ends)
-            # - enable timing (show only during specified window)
-            timed_overlay = (
-                f"overlay={x}:{y}"
-                f":eof_action=pass"  # CRITICAL: continue main video when overlay ends
-                f":enable='between(t,{timing.start_time},{timing.end_time})'"
+    def _composite_pass(
+        self,
+        video_path: Path,
+        prepared: List[Tuple[Path, OverlayConfig]],
+        output_path: Path,
+        video_width: int,
+        video_height: int,
+        cuda: bool = False,
+        base_filter: Optional[str] = None
+    ) -> bool:
+        """Build and run the single-pass composite command."""
+        encoder = self.h264_encoder
+        cmd = ["ffmpeg", "-y"]
+        if cuda:
+            cmd.extend(["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"])
+        elif encoder == "h264_vaapi":
+            cmd.extend(["-vaapi_device", VAAPI_DEVICE])
+        cmd.extend(["-i", str(video_path)])
+        filters = []
+        base_label = "0:v"
+        if base_filter:
+            filters.append(f"[0:v]{base_filter}[base]")
+            base_label = "base"
+        elif not prepared:
+            # Plain re-encode (e.g. a timeline shard with no overlays)
+            filters.append("[0:v]null[v0]")
+            base_label = "v0"
+
+        for i, (overlay_path, config) in enumerate(prepared, start=1):
+            if config.source_size and overlay_path == config.source:
+                ov_width, ov_height = config.source_size
+            else:
+                ov_width, ov_height = self.get_overlay_dimensions(overlay_path)
+            position = self.calculate_position(
+                config, video_width, video_height, ov_width, ov_height
             )
 
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", str(video_path),
-                "-stream_loop", "-1",              # Loop overlay infinitely
-                "-c:v", "libvpx-vp9",              # VP9 decoder for alpha
-                "-i", str(overlay_path),
-                "-filter_complex",
-                # Process overlay: format, trim to duration, reset PTS, add fades
-                f"[1:v]format=rgba,"
-                f"trim=duration={timing.duration},"
-                f"setpts=PTS-STARTPTS,"
-                f"fade=t=in:st=0:d={timing.fade_in}:alpha=1,"
-                f"fade=t=out:st={timing.duration - timing.fade_out}:d={timing.fade_out}:alpha=1[ov];"
-                # Composite: main video continues, overlay appears during window
-                f"[0:v][ov]{timed_overlay}",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                "-c:a", "copy",
-                # NO -shortest flag here - main video length determines output
-                str(output_path)
-            ]
+            cmd.extend(self._overlay_input_args(overlay_path, config))
+            out_label = f"v{i}"
+            filters.append(
+                self._overlay_filter(overlay_path, config, i, base_label, out_label, position, cuda)
+            )
+            base_label = out_label
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        if encoder == "h264_vaapi" and not cuda:
+            # VAAPI encodes from GPU surfaces
+            filters.append(f"[{base_label}]format=nv12,hwupload[hw]")
+            base_label = "hw"
 
-        if result.returncode != 0:
-            print(f"    Overlay error: {result.stderr[:200]}")
+        cmd.extend([
+            "-filter_complex", ";".join(filters),
+            "-map", f"[{base_label}]", "-map", "0:a?",
+            *self._encoder_args(encoder, video_height),
+            "-c:a", "copy",
+            # NO -shortest flag here - main video length determines output
+            str(output_path)
+        ])
 
-        return result.returncode == 0
+        returncode, stderr = run_ffmpeg(cmd)
+
+        if returncode != 0:
+            print(f"    Overlay error: {stderr[-200:]}")
+
+        return returncode == 0
+
+    def composite_single_overlay(
+        self,
+        video_path: Path,
+        overlay_path: Path,
+        config: OverlayConfig,
+        output_path: Path
+    ) -> bool:
+        """
+        Composite a single overlay onto video.
+
+        Handles timing, position, opacity, and fade effects.
+        """
+        return self._run_composite(video_path, [(overlay_path, config)], output_path)
+
+    def _prepare_overlays(
+        self,
+        overlays: List[OverlayConfig],
+        video_width: int,
+        video_height: int
+    ) -> List[Tuple[Path, OverlayConfig]]:
+        """
+        Prepare overlays (render Lottie, etc.) concurrently.
+
+        They're independent and mostly wait on ffmpeg/rsvg subprocesses.
+        Overlays sharing a source and scale produce the same file, so it is
+        prepared once. Overlays that fail to prepare are dropped.
+        """
+        if not overlays:
+            return []
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=min(len(overlays), os.cpu_count() or 4)) as executor:
+            for i, config in enumerate(overlays):
+                print(f"    Overlay {i+1}: {config.source.name} @ {config.position.value}")
+                key = (config.source, config.scale)
+                if key not in futures:
+                    futures[key] = executor.submit(
+                        self.prepare_overlay, config, video_width, video_height
+                    )
+
+        prepared = []
+        for config in overlays:
+            overlay_path = futures[(config.source, config.scale)].result()
+            if not overlay_path:
+                print(f"    WARNING: Failed to prepare overlay {config.source}")
+                continue
+            prepared.append((overlay_path, config))
+        return prepared
 
     def composite_overlays(
         self,
         video_path: Path,
         overlays: List[OverlayConfig],
-        output_path: Path
+        output_path: Path,
+        base_filter: Optional[str] = None
     ) -> MotionGraphicsResult:
         """
         Composite multiple overlays onto video.
 
-        Applies overlays sequentially, each building on the previous.
+        All overlays are applied in one ffmpeg pass. If that fails, falls
+        back to applying them one at a time so a single bad overlay doesn't
+        drop the rest. base_filter (e.g. drawtext lower thirds) is applied
+        to the main video in the same pass.
         """
-        if not overlays:
+        if not overlays and not base_filter:
             return MotionGraphicsResult(
                 success=False,
                 error="No overlays provided"
@@ -617,57 +1207,299 @@ class MotionGraphicsCompositor:
         print(f"  [MotionGraphics] Video: {video_width}x{video_height}")
         print(f"  [MotionGraphics] Applying {len(overlays)} overlays...")
 
-        current_video = video_path
-        applied_count = 0
-
-        for i, config in enumerate(overlays):
-            print(f"    Overlay {i+1}: {config.source.name} @ {config.position.value}")
+        prepared = self._prepare_overlays(overlays, video_width, video_height)
 
-            # Prepare overlay (render Lottie, etc.)
-            prepared = self.prepare_overlay(config, video_width, video_height)
-            if not prepared:
-                print(f"    WARNING: Failed to prepare overlay {config.source}")
-                continue
+        applied_count = 0
+        base_applied = False
+        if (prepared or base_filter) and self._run_composite(
+            video_path, prepared, output_path, (video_width, video_height), base_filter
+        ):
+            applied_count = len(prepared)
+            base_applied = bool(base_filter)
+        elif len(prepared) > 1 or (base_filter and prepared):
+            print("    Single-pass composite failed, applying overlays one at a time...")
+            # Intermediates live beside the output, so the final one is
+            # renamed into place rather than copied across filesystems
+            def intermediate(tag: str) -> Path:
+                return output_path.with_name(f".{output_path.stem}_composite_{tag}.mp4")
+
+            current_video = video_path
+            if base_filter:
+                out = intermediate("base")
+                if self._run_composite(video_path, [], out, (video_width, video_height), base_filter):
+                    base_applied = True
+                    current_video = out
+                else:
+                    out.unlink(missing_ok=True)
+                    print("    WARNING: Failed to apply base filter")
+
+            for i, (overlay_path, config) in enumerate(prepared):
+                out = intermediate(f"{i:02d}")
+                if self.composite_single_overlay(current_video, overlay_path, config, out):
+                    applied_count += 1
+                    # Drop the previous intermediate as soon as it's consumed,
+                    # so at most two full-length copies are ever on disk
+                    if current_video != video_path:
+                        current_video.unlink(missing_ok=True)
+                    current_video = out
+                else:
+                    out.unlink(missing_ok=True)
+                    print(f"    WARNING: Failed to composite overlay {i+1}")
+
+            if current_video != video_path:
+                os.replace(current_video, output_path)
+
+        # If nothing was applied, the original is the output
+        if applied_count == 0 and not base_applied:
+            clone_or_copy(video_path, output_path)
 
-            # Composite
-            if i == len(overlays) - 1:
-                # Last overlay - output to final path
-                out = output_path
-            else:
-                # Intermediate - output to temp
-                out = self.temp_dir / f"composite_{i:02d}.mp4"
+        # Get final duration
+        duration = self._probe(output_path).get("duration", 0)
 
-            if self.composite_single_overlay(current_video, prepared, config, out):
-                applied_count += 1
-                current_video = out
-            else:
-                print(f"    WARNING: Failed to composite overlay {i+1}")
+        return MotionGraphicsResult(
+            success=True,
+            output_path=output_path,
+            duration=duration,
+            overlays_applied=applied_count,
+            base_filter_applied=base_applied
+        )
 
-        # If no overlays were applied, copy original
-        if applied_count == 0:
-            shutil.copy(video_path, output_path)
+    def _keyframe_times(self, video_path: Path) -> List[float]:
+        """Video keyframe timestamps in seconds, read from packets without decoding."""
+        if HAS_AV:
+            try:
+                with av.open(str(video_path)) as container:
+                    stream = container.streams.video[0]
+                    times = [
+                        float(packet.pts * packet.time_base)
+                        for packet in container.demux(stream)
+                        if packet.is_keyframe and packet.pts is not None
+                    ]
+                if times:
+                    return sorted(times)
+            except Exception:
+                pass
 
-        # Get final duration
         cmd = [
             "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "json",
-            str(output_path)
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            str(video_path)
         ]
         result = subprocess.run(cmd, capture_output=True, text=True)
+        times = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                times.append(float(pts_time))
+        return sorted(times)
+
+    def composite_overlays_parallel(
+        self,
+        video_path: Path,
+        overlays: List[OverlayConfig],
+        output_path: Path,
+        n_shards: Optional[int] = None
+    ) -> MotionGraphicsResult:
+        """
+        Composite overlays by splitting the video into time shards.
+
+        Shard boundaries are snapped to keyframes outside every overlay's
+        window, so each shard is cut with stream copy, composited with only
+        its own overlays in parallel, and the results are concatenated
+        without another re-encode. Falls back to composite_overlays when the
+        video can't be usefully split.
+        """
+        if not overlays:
+            return MotionGraphicsResult(
+                success=False,
+                error="No overlays provided"
+            )
+
+        n_shards = n_shards or min(os.cpu_count() or 1, MAX_TIME_SHARDS)
+        duration = self._probe(video_path).get("duration", 0)
+        if n_shards < 2 or duration < 2 * MIN_SHARD_SECONDS:
+            return self.composite_overlays(video_path, overlays, output_path)
+
+        boundaries = _shard_boundaries(
+            duration, n_shards, self._keyframe_times(video_path),
+            [(o.timing.start_time, o.timing.end_time if o.timing.duration > 0 else float("inf"))
+             for o in overlays]
+        )
+        if not boundaries:
+            return self.composite_overlays(video_path, overlays, output_path)
+
+        video_width, video_height = self.get_video_dimensions(video_path)
+        print(f"  [MotionGraphics] Video: {video_width}x{video_height}")
+        print(f"  [MotionGraphics] Applying {len(overlays)} overlays across {len(boundaries) + 1} shards...")
+        prepared = self._prepare_overlays(overlays, video_width, video_height)
+
+        shard_dir = Path(tempfile.mkdtemp(prefix="shards_", dir=self.temp_dir))
         try:
-            duration = float(json.loads(result.stdout)["format"]["duration"])
-        except:
-            duration = 0
+            # Boundaries sit on keyframes, so stream copy cuts exactly there
+            cmd = [
+                "ffmpeg", "-y", "-i", str(video_path),
+                "-map", "0", "-c", "copy",
+                "-f", "segment",
+                "-segment_times", ",".join(f"{t:.6f}" for t in boundaries),
+                "-reset_timestamps", "1",
+                str(shard_dir / "in_%03d.mp4")
+            ]
+            returncode, _ = run_ffmpeg(cmd)
+            chunks = sorted(shard_dir.glob("in_*.mp4"))
+            if returncode != 0 or len(chunks) != len(boundaries) + 1:
+                print("    Timeline split failed, compositing in one pass...")
+                return self.composite_overlays(video_path, overlays, output_path)
+
+            # Every shard is re-encoded, even ones without overlays, so all
+            # parts share encoder settings and concat with stream copy
+            starts = [0.0, *boundaries]
+            ends = [*boundaries, float("inf")]
+            jobs = []
+            for chunk, start, end in zip(chunks, starts, ends):
+                shard_overlays = [
+                    (path, replace(config, timing=replace(
+                        config.timing, start_time=config.timing.start_time - start
+                    )))
+                    for path, config in prepared
+                    if start <= config.timing.start_time < end
+                ]
+                jobs.append((chunk, shard_overlays, chunk.with_name(chunk.name.replace("in_", "out_"))))
+
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                ok = list(executor.map(
+                    lambda job: self._run_composite(job[0], job[1], job[2], (video_width, video_height)),
+                    jobs
+                ))
+            if not all(ok):
+                print("    Shard composite failed, compositing in one pass...")
+                return self.composite_overlays(video_path, overlays, output_path)
+
+            concat_list = shard_dir / "concat.txt"
+            concat_list.write_text("".join(f"file '{out.resolve()}'\n" for _, _, out in jobs))
+            cmd = [
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+                "-i", str(concat_list),
+                "-c", "copy",
+                str(output_path)
+            ]
+            returncode, stderr = run_ffmpeg(cmd)
+            if returncode != 0:
+                print(f"    Concat error: {stderr[-200:]}")
+                return self.composite_overlays(video_path, overlays, output_path)
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
 
         return MotionGraphicsResult(
             success=True,
             output_path=output_path,
-            duration=duration,
-            overlays_applied=applied_count
+            duration=self._probe(output_path).get("duration", 0),
+            overlays_applied=len(prepared)
         )
 
 
+def _shard_boundaries(
+    duration: float,
+    n_shards: int,
+    keyframes: List[float],
+    windows: List[Tuple[float, float]]
+) -> List[float]:
+    """
+    Pick up to n_shards - 1 cut points near equal divisions of duration.
+
+    Cuts land on keyframes (relative to the first one) that fall outside
+    every overlay window and leave at least MIN_SHARD_SECONDS per shard.
+    """
+    if not keyframes:
+        return []
+    origin = keyframes[0]
+    candidates = [
+        t - origin for t in keyframes
+        if not any(start < t - origin < end for start, end in windows)
+    ]
+
+    boundaries: List[float] = []
+    for i in range(1, n_shards):
+        target = duration * i / n_shards
+        low = (boundaries[-1] if boundaries else 0.0) + MIN_SHARD_SECONDS
+        usable = [t for t in candidates if low <= t <= duration - MIN_SHARD_SECONDS]
+        if not usable:
+            break
+        boundaries.append(min(usable, key=lambda t: abs(t - target)))
+    return boundaries
+
+
+def clone_or_copy(source: Path, dest: Path):
+    """
+    Materialize source at dest without copying bytes where possible.
+
+    Tries a copy-on-write clone (reflink on Linux, clonefile on macOS),
+    then a plain copy. No hardlinks: later ffmpeg -y writes to dest would
+    truncate source along with it.
+    """
+    if source.resolve() == dest.resolve():
+        return
+    dest.unlink(missing_ok=True)
+    clone_flag = {"linux": "--reflink=auto", "darwin": "-c"}.get(sys.platform)
+    if clone_flag and shutil.which("cp"):
+        result = subprocess.run(["cp", clone_flag, str(source), str(dest)], capture_output=True)
+        if result.returncode == 0:
+            return
+
+    shutil.copyfile(source, dest)
+
+
+def read_png_size(path: Path) -> Optional[Tuple[int, int]]:
+    """(width, height) from a PNG's IHDR chunk, or None if path isn't a readable PNG."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+
+def _av_probe(path: Path) -> Optional[Dict[str, Any]]:
+    """Probe width, height, pix_fmt and duration with PyAV (None on failure)."""
+    try:
+        with av.open(str(path)) as container:
+            info: Dict[str, Any] = {}
+            if container.streams.video:
+                stream = container.streams.video[0]
+                info["width"] = stream.width
+                info["height"] = stream.height
+                info["pix_fmt"] = stream.codec_context.pix_fmt
+            if container.duration is not None:
+                info["duration"] = container.duration / av.time_base
+            return info
+    except Exception:
+        return None
+
+
+def _parse_color(color: str) -> Tuple[int, int, int, int]:
+    """
+    Parse an ImageMagick-style color for Pillow.
+
+    Handles "transparent"/"none" and rgba() with a 0-1 alpha, which
+    Pillow's ImageColor doesn't accept.
+    """
+    color = color.strip()
+    if color.lower() in ("transparent", "none"):
+        return (0, 0, 0, 0)
+
+    if color.lower().startswith("rgba(") and color.endswith(")"):
+        r, g, b, a = (part.strip() for part in color[5:-1].split(","))
+        alpha = float(a)
+        # ImageMagick/CSS alpha is 0-1; Pillow's is 0-255
+        alpha = round(alpha * 255) if alpha <= 1 else int(alpha)
+        return (int(r), int(g), int(b), alpha)
+
+    return ImageColor.getcolor(color, "RGBA")
+
+
 class TextOverlayGenerator:
     """
     Generates text-based overlays for lower thirds, titles, and captions.
@@ -684,6 +1516,25 @@ class TextOverlayGenerator:
     def __init__(self, temp_dir: Optional[Path] = None):
         self.temp_dir = temp_dir or Path(tempfile.mkdtemp())
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self._fonts: Dict[Tuple[str, int], Any] = {}
+
+    def _load_font(self, font: str, size: int, default: bool = False):
+        """
+        Load (and cache) a Pillow font by name or path.
+
+        Returns None if the font can't be found, unless default is set, in
+        which case Pillow's bundled font is used instead.
+        """
+        key = (font if not default else "", size)
+        if key not in self._fonts:
+            try:
+                self._fonts[key] = ImageFont.load_default(size) if default else ImageFont.truetype(font, size)
+            except OSError:
+                self._fonts[key] = None
+            except TypeError:
+                # Pillow < 10.1 has no sized default font
+                self._fonts[key] = ImageFont.load_default()
+        return self._fonts[key]
 
     def create_lower_third(
         self,
@@ -702,6 +1553,9 @@ class TextOverlayGenerator:
         """
         Create a lower third text overlay PNG.
 
+        Drawn in-process with Pillow; ImageMagick is only used when Pillow
+        is missing or can't resolve the font name.
+
         Format:
         ┌─────────────────────────┐
         │ ▌ Name                  │
@@ -710,6 +1564,27 @@ class TextOverlayGenerator:
         """
         output = output_path or self.temp_dir / f"lower_third_{name.replace(' ', '_')}.png"
 
+        def draw_with_pillow(default_font: bool) -> bool:
+            name_font = self._load_font(font, name_size, default_font)
+            title_font = self._load_font(font, title_size, default_font)
+            if name_font is None or title_font is None:
+                return False
+
+            img = Image.new("RGBA", (width, height), _parse_color(bg_color))
+            draw = ImageDraw.Draw(img)
+            # Accent bar on left
+            draw.rectangle([0, 0, 8, height], fill=_parse_color(accent_color))
+            # Name text
+            draw.text((20, 15), name, font=name_font, fill=_parse_color(text_color))
+            if title:
+                draw.text((20, 15 + name_size + 5), title, font=title_font, fill=(255, 255, 255, 204))
+
+            img.save(output, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+            return True
+
+        if HAS_PIL and draw_with_pillow(default_font=False):
+            return output
+
         # Use ImageMagick to create
         # Two-tier lower third with accent bar
         cmd = [
@@ -736,7 +1611,11 @@ class TextOverlayGenerator:
 
         cmd.append(str(output))
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        if shutil.which("convert"):
+            subprocess.run(cmd, capture_output=True, text=True)
+
+        if not output.exists() and HAS_PIL:
+            draw_with_pillow(default_font=True)
 
         return output if output.exists() else None
 
@@ -751,9 +1630,26 @@ class TextOverlayGenerator:
         text_color: str = DEFAULT_COLOR,
         bg_color: str = "transparent"
     ) -> Path:
-        """Create a centered title card."""
+        """Create a centered title card (Pillow, falling back to ImageMagick)."""
         output = output_path or self.temp_dir / f"title_{text[:20].replace(' ', '_')}.png"
 
+        def draw_with_pillow(default_font: bool) -> bool:
+            title_font = self._load_font(font, font_size, default_font)
+            if title_font is None:
+                return False
+
+            img = Image.new("RGBA", (width, height), _parse_color(bg_color))
+            draw = ImageDraw.Draw(img)
+            draw.text(
+                (width / 2, height / 2), text, font=title_font,
+                fill=_parse_color(text_color), anchor="mm", align="center"
+            )
+            img.save(output, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+            return True
+
+        if HAS_PIL and draw_with_pillow(default_font=False):
+            return output
+
         cmd = [
             "convert",
             "-size", f"{width}x{height}",
@@ -766,7 +1662,12 @@ class TextOverlayGenerator:
             str(output)
         ]
 
-        subprocess.run(cmd, capture_output=True)
+        if shutil.which("convert"):
+            subprocess.run(cmd, capture_output=True)
+
+        if not output.exists() and HAS_PIL:
+            draw_with_pillow(default_font=True)
+
         return output if output.exists() else None
 
 
@@ -966,13 +1867,13 @@ class BroadcastOverlays:
             f"fade=t=in:st=0:d={fade}:alpha=1,"
             f"fade=t=out:st={duration - fade}:d={fade}:alpha=1[ov];"
             f"[0:v][ov]{overlay_filter}",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+            *h264_encoder_args(height),
             "-c:a", "copy",
             str(output_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.returncode == 0
+        returncode, _ = run_ffmpeg(cmd)
+        return returncode == 0
 
     def apply_ticker(
         self,
@@ -1021,20 +1922,21 @@ class BroadcastOverlays:
             "ffmpeg", "-y",
             "-i", str(video_path),
             "-vf", ticker_filter,
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+            *h264_encoder_args(height),
             "-c:a", "copy",
             str(output_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.returncode == 0
+        returncode, _ = run_ffmpeg(cmd)
+        return returncode == 0
 
 
 def add_motion_graphics(
     video_path: Path,
     output_path: Path,
     overlays: List[Dict[str, Any]],
-    temp_dir: Optional[Path] = None
+    temp_dir: Optional[Path] = None,
+    base_filter: Optional[str] = None
 ) -> MotionGraphicsResult:
     """
     Convenience function to add motion graphics to a video.
@@ -1053,6 +1955,8 @@ def add_motion_graphics(
                 "scale": 1.0,
                 "opacity": 1.0
             }
+        base_filter: Optional filter chain (e.g. drawtext) applied to the
+            video in the same pass as the overlays
     """
     compositor = MotionGraphicsCompositor(temp_dir)
 
@@ -1074,11 +1978,12 @@ def add_motion_graphics(
             x_offset=ov.get("x_offset", 0),
             y_offset=ov.get("y_offset", 0),
             custom_x=ov.get("x"),
-            custom_y=ov.get("y")
+            custom_y=ov.get("y"),
+            source_size=ov.get("source_size")
         )
         configs.append(config)
 
-    return compositor.composite_overlays(video_path, configs, output_path)
+    return compositor.composite_overlays(video_path, configs, output_path, base_filter=base_filter)
 
 
 if __name__ == "__main__":
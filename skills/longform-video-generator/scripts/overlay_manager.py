@@ -19,17 +19,23 @@ Reference: https://riverside.fm/blog/lower-thirds
 Reference: https://blog.frame.io/2017/12/04/create-lower-thirds-titles-that-dont-suck/
 """
 
+import os
+import re
 import json
+import hashlib
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
+from types import MappingProxyType
 
 from motion_graphics import (
     OverlayConfig, OverlayPosition, OverlayTiming,
     MotionGraphicsCompositor, TextOverlayGenerator,
-    add_motion_graphics, MotionGraphicsResult
+    MotionGraphicsResult, read_png_size, clone_or_copy
 )
 
 from design_system import (
@@ -38,7 +44,7 @@ from design_system import (
 )
 
 
-class OverlayType(Enum):
+class OverlayType(str, Enum):
     """Types of overlays for different use cases."""
     LOWER_THIRD = "lower_third"       # Name/title identification
     LOGO_WATERMARK = "logo_watermark" # Brand logo
@@ -50,7 +56,7 @@ class OverlayType(Enum):
     CUSTOM = "custom"                 # User-defined
 
 
-class ContentContext(Enum):
+class ContentContext(str, Enum):
     """Video content context for intelligent placement."""
     TALKING_HEAD = "talking_head"     # Person speaking to camera
     B_ROLL = "b_roll"                 # Supplementary footage
@@ -63,7 +69,39 @@ class ContentContext(Enum):
     OUTRO = "outro"                   # Closing sequence
 
 
-@dataclass
+# Keyword markers for analyze_segment_context, checked in this order.
+# Matched as case-insensitive substrings ("hi " keeps its trailing space
+# so it doesn't fire inside words like "this").
+_INTRO_WORDS = frozenset({"welcome", "hello", "hi ", "hey "})
+_OUTRO_WORDS = frozenset({"thank", "goodbye", "subscribe", "follow", "link"})
+_PRODUCT_WORDS = frozenset({"product", "feature", "tool", "app", "software"})
+
+
+def _keyword_re(words: frozenset) -> "re.Pattern":
+    return re.compile("|".join(re.escape(w) for w in sorted(words)), re.IGNORECASE)
+
+
+_INTRO_RE = _keyword_re(_INTRO_WORDS)
+_OUTRO_RE = _keyword_re(_OUTRO_WORDS)
+_PRODUCT_RE = _keyword_re(_PRODUCT_WORDS)
+
+
+# Stateless; shared by every create_branded_video call
+_TEXT_RENDERER = FFmpegTextRenderer()
+
+# Compositors by temp_dir, shared across OverlayManagers so probe results
+# and the detected encoder carry over between videos in a batch
+_compositors: Dict[Path, MotionGraphicsCompositor] = {}
+
+
+def _get_compositor(temp_dir: Path) -> MotionGraphicsCompositor:
+    key = temp_dir.resolve()
+    if key not in _compositors:
+        _compositors[key] = MotionGraphicsCompositor(temp_dir)
+    return _compositors[key]
+
+
+@dataclass(slots=True)
 class OverlayTemplate:
     """Pre-configured overlay template for common use cases."""
     name: str
@@ -77,7 +115,7 @@ class OverlayTemplate:
     local_asset: Optional[Path] = None
 
 
-# Pre-built templates for common overlay types
+# Pre-built templates for common overlay types (read-only view, see below)
 OVERLAY_TEMPLATES = {
     # Lower thirds
     "lower_third_simple": OverlayTemplate(
@@ -138,9 +176,10 @@ OVERLAY_TEMPLATES = {
         default_duration=1.0
     ),
 }
+OVERLAY_TEMPLATES = MappingProxyType(OVERLAY_TEMPLATES)
 
 
-@dataclass
+@dataclass(slots=True)
 class OverlayPlan:
     """A planned overlay to be applied to video."""
     type: OverlayType
@@ -153,9 +192,26 @@ class OverlayPlan:
     scale: float = 1.0
     text_content: Optional[Dict] = None  # For generated text overlays
     template: Optional[str] = None       # Template name to use
+    source_size: Optional[Tuple[int, int]] = None  # Known (w, h) of source
+    source_exists: Optional[bool] = None  # Already checked/created; skips a stat
+
+    def to_overlay_config(self, video_duration: float = 0) -> OverlayConfig:
+        """Compositor config for this plan (duration 0 = entire video)."""
+        return OverlayConfig(
+            source=Path(self.source),
+            position=self.position,
+            timing=OverlayTiming(
+                start_time=self.start_time,
+                duration=self.duration if self.duration > 0 else video_duration,
+                fade_in=self.fade_in,
+                fade_out=self.fade_out
+            ),
+            scale=self.scale,
+            source_size=self.source_size
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoSegment:
     """A segment of video with associated metadata."""
     index: int
@@ -187,8 +243,12 @@ class OverlayManager:
         self.assets_dir = assets_dir
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
-        self.compositor = MotionGraphicsCompositor(self.temp_dir)
+        self.compositor = _get_compositor(self.temp_dir)
         self.text_gen = TextOverlayGenerator(self.temp_dir)
+        # Rendered text PNGs keyed by a hash of their content and styling
+        self.text_cache_dir = self.temp_dir / "text_cache"
+        self.text_cache_dir.mkdir(exist_ok=True)
+        self._text_cache: Dict[str, Path] = {}
 
         self.overlay_plans: List[OverlayPlan] = []
 
@@ -198,16 +258,16 @@ class OverlayManager:
 
         Used for intelligent overlay placement.
         """
-        text_lower = segment.text.lower()
+        text = segment.text
 
         # Check for intro/outro markers
-        if segment.index == 0 or any(w in text_lower for w in ["welcome", "hello", "hi ", "hey "]):
+        if segment.index == 0 or _INTRO_RE.search(text):
             return ContentContext.INTRO
-        if any(w in text_lower for w in ["thank", "goodbye", "subscribe", "follow", "link"]):
+        if _OUTRO_RE.search(text):
             return ContentContext.OUTRO
 
         # Check for product mentions
-        if any(w in text_lower for w in ["product", "feature", "tool", "app", "software"]):
+        if _PRODUCT_RE.search(text):
             return ContentContext.PRODUCT_SHOT
 
         # Check for interview/dialogue markers
@@ -241,7 +301,9 @@ class OverlayManager:
         logo_path: Path,
         position: OverlayPosition = OverlayPosition.BOTTOM_RIGHT,
         duration: float = 0,  # 0 = entire video
-        scale: float = 0.15
+        scale: float = 0.15,
+        source_size: Optional[Tuple[int, int]] = None,
+        source_exists: Optional[bool] = None
     ) -> OverlayPlan:
         """Plan a logo watermark overlay."""
         return OverlayPlan(
@@ -252,7 +314,9 @@ class OverlayManager:
             duration=duration,
             scale=scale,
             fade_in=0.5,
-            fade_out=0.5
+            fade_out=0.5,
+            source_size=source_size,
+            source_exists=source_exists
         )
 
     def plan_cta(
@@ -317,23 +381,25 @@ class OverlayManager:
             plans.append(self.plan_logo_watermark(
                 logo_path,
                 position=OverlayPosition.BOTTOM_RIGHT,
-                duration=video_duration
+                duration=video_duration,
+                source_exists=True
             ))
 
         # 2. Lower thirds for speakers
         if include_lower_thirds:
-            shown_speakers = set()
-
+            # First appearance of each speaker, in order of appearance
+            first_by_speaker: Dict[str, VideoSegment] = {}
             for segment in segments:
-                if segment.speaker and segment.speaker not in shown_speakers:
-                    # Show lower third at first appearance
-                    plans.append(self.plan_lower_third(
-                        name=segment.speaker,
-                        title=segment.speaker_title or "",
-                        start_time=segment.start + 0.5,  # Slight delay
-                        duration=5.0
-                    ))
-                    shown_speakers.add(segment.speaker)
+                if segment.speaker:
+                    first_by_speaker.setdefault(segment.speaker, segment)
+
+            for speaker, segment in first_by_speaker.items():
+                plans.append(self.plan_lower_third(
+                    name=speaker,
+                    title=segment.speaker_title or "",
+                    start_time=segment.start + 0.5,  # Slight delay
+                    duration=5.0
+                ))
 
         # 3. CTA near the end
         if cta_text:
@@ -348,30 +414,77 @@ class OverlayManager:
         self.overlay_plans = plans
         return plans
 
+    def _text_params(self, plan: OverlayPlan) -> Optional[Dict[str, Any]]:
+        """create_lower_third arguments for a text plan (None for non-text plans)."""
+        if not plan.text_content:
+            return None
+        if plan.type == OverlayType.LOWER_THIRD:
+            return {
+                "name": plan.text_content.get("name", ""),
+                "title": plan.text_content.get("title", "")
+            }
+        if plan.type == OverlayType.CTA:
+            return {
+                "name": plan.text_content.get("text", ""),
+                "title": "",
+                "bg_color": "rgba(52,152,219,0.9)",  # Blue background
+                "accent_color": "#2ecc71"  # Green accent
+            }
+        return None
+
+    def _cached_lower_third(self, key: str, params: Dict[str, Any]) -> Optional[Path]:
+        """
+        Render a lower third PNG, reusing an earlier render of the same params.
+
+        Repeated speakers and re-runs hit the cache instead of re-rasterizing.
+        """
+        if key in self._text_cache:
+            return self._text_cache[key]
+
+        png_path = self.text_cache_dir / f"{key}.png"
+        if not png_path.exists():
+            tmp_path = self.text_cache_dir / f".{key}.{os.getpid()}_{threading.get_ident()}.png"
+            if not self.text_gen.create_lower_third(output_path=tmp_path, **params) or not tmp_path.exists():
+                return None
+            os.replace(tmp_path, png_path)
+
+        self._text_cache[key] = png_path
+        return png_path
+
     def generate_text_overlays(self) -> Dict[int, Path]:
-        """Generate text-based overlays (lower thirds, CTAs) as PNGs."""
-        generated = {}
+        """
+        Generate text-based overlays (lower thirds, CTAs) as PNGs.
 
+        Distinct overlays are rendered concurrently; plans with identical
+        text and styling share one render.
+        """
+        keys: Dict[int, str] = {}
+        unique: Dict[str, Dict[str, Any]] = {}
         for i, plan in enumerate(self.overlay_plans):
-            if plan.text_content and plan.type == OverlayType.LOWER_THIRD:
-                png_path = self.text_gen.create_lower_third(
-                    name=plan.text_content.get("name", ""),
-                    title=plan.text_content.get("title", "")
-                )
-                if png_path:
-                    plan.source = png_path
-                    generated[i] = png_path
-
-            elif plan.text_content and plan.type == OverlayType.CTA:
-                png_path = self.text_gen.create_lower_third(
-                    name=plan.text_content.get("text", ""),
-                    title="",
-                    bg_color="rgba(52,152,219,0.9)",  # Blue background
-                    accent_color="#2ecc71"  # Green accent
-                )
-                if png_path:
-                    plan.source = png_path
-                    generated[i] = png_path
+            params = self._text_params(plan)
+            if params is None:
+                continue
+            key = hashlib.blake2b(
+                json.dumps(params, sort_keys=True).encode(), digest_size=16
+            ).hexdigest()
+            keys[i] = key
+            unique.setdefault(key, params)
+
+        if not unique:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(len(unique), os.cpu_count() or 4)) as executor:
+            rendered = dict(zip(unique, executor.map(
+                lambda item: self._cached_lower_third(*item), unique.items()
+            )))
+
+        generated = {}
+        for i, key in keys.items():
+            png_path = rendered[key]
+            if png_path:
+                self.overlay_plans[i].source = png_path
+                self.overlay_plans[i].source_exists = True
+                generated[i] = png_path
 
         return generated
 
@@ -387,24 +500,21 @@ class OverlayManager:
         # Generate text overlays first
         self.generate_text_overlays()
 
-        # Convert plans to overlay configs
-        overlays = []
-        for plan in self.overlay_plans:
-            if not plan.source:
-                continue
+        # Fail before any encode work if an asset has gone missing
+        missing = [
+            i for i, plan in enumerate(self.overlay_plans)
+            if plan.source and not plan.source_exists and not Path(plan.source).exists()
+        ]
+        if missing:
+            return MotionGraphicsResult(
+                success=False,
+                error=f"Missing overlay assets for plans {missing}"
+            )
 
-            # Handle duration=0 (entire video)
-            duration = plan.duration if plan.duration > 0 else video_duration
-
-            overlays.append({
-                "source": str(plan.source),
-                "position": plan.position.value,
-                "start_time": plan.start_time,
-                "duration": duration,
-                "fade_in": plan.fade_in,
-                "fade_out": plan.fade_out,
-                "scale": plan.scale
-            })
+        overlays = [
+            plan.to_overlay_config(video_duration)
+            for plan in self.overlay_plans if plan.source
+        ]
 
         if not overlays:
             return MotionGraphicsResult(
@@ -412,12 +522,7 @@ class OverlayManager:
                 error="No overlays to apply"
             )
 
-        return add_motion_graphics(
-            video_path,
-            output_path,
-            overlays,
-            temp_dir=self.temp_dir
-        )
+        return self.compositor.composite_overlays(video_path, overlays, output_path)
 
 
 def create_branded_video(
@@ -428,7 +533,9 @@ def create_branded_video(
     lower_thirds: Optional[List[Dict]] = None,
     lottie_overlays: Optional[List[Dict]] = None,
     match_video_colors: bool = True,
-    style: DesignStyle = DesignStyle.MINIMAL
+    style: DesignStyle = DesignStyle.MINIMAL,
+    video_duration: Optional[float] = None,
+    video_size: Optional[Tuple[int, int]] = None
 ) -> MotionGraphicsResult:
     """
     Create a professionally branded video with high-quality overlays.
@@ -448,6 +555,9 @@ def create_branded_video(
         lottie_overlays: List of {"path": "...", "position": "...", "start": 0.0}
         match_video_colors: Extract accent colors from video
         style: Design style (MINIMAL, CORPORATE, CINEMATIC, etc.)
+        video_duration: Duration in seconds, if already known (skips ffprobe
+            when video_size is also given)
+        video_size: (width, height), if already known
 
     Example:
         create_branded_video(
@@ -462,18 +572,44 @@ def create_branded_video(
     """
     print(f"  [Design] Creating professionally branded video...")
 
-    # Get video duration and dimensions
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "json",
-        str(video_path)
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    try:
-        video_duration = float(json.loads(result.stdout)["format"]["duration"])
-    except:
-        video_duration = 60.0
+    # Nothing to draw: the input is the output, no probe or encode needed
+    has_logo = bool(logo_path) and logo_path.exists()
+    if not (lower_thirds or cta_text or has_logo or lottie_overlays):
+        clone_or_copy(video_path, output_path)
+        return MotionGraphicsResult(
+            success=True,
+            output_path=output_path,
+            duration=video_duration or 0.0,
+            overlays_applied=0
+        )
+
+    # Get video duration and dimensions in one probe, unless the caller knows them
+    if video_duration is None or video_size is None:
+        # Flat key=value output: three short lines, no JSON document to parse
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height:format=duration",
+            "-of", "default=noprint_wrappers=1",
+            str(video_path)
+        ]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        probe = {}
+        for line in result.stdout.decode(errors="replace").splitlines():
+            key, _, value = line.partition("=")
+            probe[key] = value
+
+        if video_duration is None:
+            try:
+                video_duration = float(probe["duration"])
+            except (KeyError, ValueError):
+                video_duration = 60.0
+        if video_size is None:
+            try:
+                video_size = (int(probe["width"]), int(probe["height"]))
+            except (KeyError, ValueError):
+                video_size = (1920, 1080)
+    video_width, video_height = video_size
 
     # Extract colors from video for design harmony
     palette = ColorPalette()
@@ -510,66 +646,55 @@ def create_branded_video(
         })
         print(f"    CTA: {cta_text} @ {cta_start}s")
 
-    # Apply text overlays using FFmpeg (professional quality)
-    current_video = video_path
-
+    # Text, logo and Lottie overlays all go into one filtergraph, so the
+    # video is decoded and encoded once
+    base_filter = None
     if text_overlays:
-        renderer = FFmpegTextRenderer()
-        temp_output = output_path.parent / "temp_text_overlay.mp4"
-
-        if renderer.apply_text_overlay(current_video, temp_output, text_overlays):
-            current_video = temp_output
-            print(f"    Applied {len(text_overlays)} text overlays")
-        else:
-            print("    WARNING: Text overlay failed, continuing without")
-
-    # Apply logo watermark if provided
-    if logo_path and logo_path.exists():
-        manager = OverlayManager()
-        manager.overlay_plans.append(
-            manager.plan_logo_watermark(logo_path, duration=video_duration, scale=0.12)
+        base_filter = _TEXT_RENDERER.build_filter_chain(
+            text_overlays, video_width, video_height
         )
 
-        # Use motion graphics compositor for logo
-        result = manager.apply_overlays(current_video, output_path, video_duration)
-
-        # Clean up temp file
-        if current_video != video_path and current_video.exists():
-            current_video.unlink()
-
-        return result
-
-    # Apply Lottie overlays if provided
-    if lottie_overlays:
-        overlays = []
-        for lov in lottie_overlays:
-            overlays.append({
-                "source": lov["path"],
-                "position": lov.get("position", "lower_third_left"),
-                "start_time": lov.get("start", 0),
-                "duration": lov.get("duration", 4.0),
-                "scale": lov.get("scale", 1.0)
-            })
-
-        result = add_motion_graphics(current_video, output_path, overlays)
-
-        # Clean up temp file
-        if current_video != video_path and current_video.exists():
-            current_video.unlink()
-
-        return result
-
-    # If only text overlays, copy to final output
-    if current_video != video_path:
-        import shutil
-        shutil.move(str(current_video), str(output_path))
+    manager = OverlayManager()
+    plans = []
+
+    # Logo watermark
+    if has_logo:
+        plans.append(manager.plan_logo_watermark(
+            logo_path, duration=video_duration, scale=0.12,
+            source_size=read_png_size(logo_path), source_exists=True
+        ))
+
+    # Lottie overlays
+    for lov in lottie_overlays or []:
+        plans.append(manager.plan_lottie_overlay(
+            Path(lov["path"]),
+            OverlayPosition(lov.get("position", "lower_third_left")),
+            start_time=lov.get("start", 0),
+            duration=lov.get("duration", 4.0),
+            scale=lov.get("scale", 1.0)
+        ))
+
+    if not plans and not base_filter:
+        clone_or_copy(video_path, output_path)
+        return MotionGraphicsResult(
+            success=True,
+            output_path=output_path,
+            duration=video_duration,
+            overlays_applied=0
+        )
 
-    return MotionGraphicsResult(
-        success=True,
-        output_path=output_path,
-        duration=video_duration,
-        overlays_applied=len(text_overlays)
+    result = manager.compositor.composite_overlays(
+        video_path,
+        [plan.to_overlay_config(video_duration) for plan in plans],
+        output_path,
+        base_filter=base_filter
     )
+    if result.base_filter_applied:
+        print(f"    Applied {len(text_overlays)} text overlays")
+        result.overlays_applied += len(text_overlays)
+    elif text_overlays:
+        print("    WARNING: Text overlay failed, continuing without")
+    return result
 
 
 if __name__ == "__main__":
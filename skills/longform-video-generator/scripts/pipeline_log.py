@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Shared progress logger for the generation pipeline.
+
+Records go through a QueueHandler to a single listener thread that owns
+stdout, so concurrent frame/scene workers never block on the stdout lock
+or interleave partial lines.
+"""
+
+import sys
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+logger = logging.getLogger("longform")
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO) -> logging.Logger:
+    """Attach the queue-fed stdout handler to the pipeline logger (idempotent)"""
+    global _listener
+    if _listener is not None:
+        logger.setLevel(level)
+        return logger
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Optional native build of the Lottie search module with mypyc.
+
+    pip install "mypy[mypyc]"
+    python setup_mypyc.py build_ext --inplace
+
+This drops lottie_search.*.so next to lottie_search.py. Python imports the
+extension in preference to the source, and falls back to the .py file when
+it isn't built. Rebuild (or delete the .so) after editing lottie_search.py.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="longform-lottie-search",
+    ext_modules=mypycify(["--ignore-missing-imports", "lottie_search.py"]),
+)
@@ -6,12 +6,43 @@ Concatenates video clips, adds audio tracks, and applies effects.
 
 import os
 import sys
-import json
+import atexit
+import threading
 import subprocess
-import tempfile
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+import json_io
+from motion_graphics import h264_encoder_args, run_ffmpeg
+
+# ffprobe results by absolute path, kept with the mtime/size they were
+# probed at and persisted between runs
+PROBE_CACHE_PATH = Path.home() / ".cache" / "longform-video" / "ffprobe.json"
+_probe_cache: Optional[Dict[str, Any]] = None
+_probe_cache_dirty = False
+_probe_cache_lock = threading.Lock()
+# Concurrent ffprobe processes when probing a batch of clips
+PROBE_WORKERS = 8
+
+# Recent ffmpeg can mux concat lists very slowly while seeking in the
+# list input; the list is read from a (non-seekable) pipe with a deeper
+# packet queue, and entries use file: URLs so the pipe protocol can
+# open them. genpts fills in timestamps missing from joined clips
+CONCAT_LIST_INPUT_ARGS = [
+    "-protocol_whitelist", "file,pipe", "-thread_queue_size", "1024", "-fflags", "+genpts"
+]
+# Deliverable outputs: drop inherited container metadata and put the moov
+# atom first, so serving the file needs no second rewrite. Intermediates
+# (normalized clips, image clips) skip faststart - it's an extra pass
+FINAL_OUTPUT_ARGS = ["-map_metadata", "-1", "-movflags", "+faststart"]
+# Ken Burns source width as a multiple of the output width
+KEN_BURNS_OVERSAMPLE = 4
+# Packet queue per input for multi-input filter graphs, so one slow
+# demuxer doesn't block the others
+INPUT_THREAD_QUEUE_SIZE = 512
 
 
 def check_ffmpeg():
@@ -25,18 +56,126 @@ def check_ffmpeg():
         return False
 
 
+def _load_probe_cache() -> Dict[str, Any]:
+    """Load the persisted ffprobe cache once, and save it again at exit"""
+    global _probe_cache
+    with _probe_cache_lock:
+        if _probe_cache is None:
+            try:
+                _probe_cache = json_io.load_file(PROBE_CACHE_PATH)
+            except (OSError, ValueError):
+                _probe_cache = {}
+            atexit.register(_save_probe_cache)
+    return _probe_cache
+
+
+def _save_probe_cache():
+    if not _probe_cache_dirty:
+        return
+    try:
+        PROBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        json_io.dump_file(_probe_cache, PROBE_CACHE_PATH, indent=False)
+    except OSError:
+        pass
+
+
 def get_video_info(video_path: Path) -> Dict[str, Any]:
-    """Get video metadata using ffprobe"""
+    """
+    Get video metadata using ffprobe.
+
+    Results are cached per file (invalidated when its mtime or size
+    changes) in memory and on disk, so repeat probes don't fork ffprobe.
+    """
+    global _probe_cache_dirty
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return {}
+    key = os.path.abspath(video_path)
+    cache = _load_probe_cache()
+    entry = cache.get(key)
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return entry["info"]
+
     cmd = [
         "ffprobe", "-v", "quiet", "-print_format", "json",
         "-show_format", "-show_streams", str(video_path)
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode == 0:
-        return json.loads(result.stdout)
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        return {}
+
+    info = json_io.loads(result.stdout)
+    cache[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "info": info}
+    _probe_cache_dirty = True
+    return info
+
+
+def probe_videos(video_paths: List[Path]) -> List[Dict[str, Any]]:
+    """
+    get_video_info for several clips, with the ffprobe calls run in parallel.
+
+    Multi-clip operations call this up front so that their later per-clip
+    lookups (durations, heights, stream parameters) all hit the cache
+    instead of probing one clip at a time.
+    """
+    if not video_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(video_paths))) as executor:
+        return list(executor.map(get_video_info, video_paths))
+
+
+def _total_duration(video_paths: List[Path]) -> float:
+    """Summed container duration of clips, from the probe cache"""
+    total = 0.0
+    for path in video_paths:
+        try:
+            total += float(get_video_info(path).get("format", {}).get("duration", 0))
+        except ValueError:
+            pass
+    return total
+
+
+def _video_stream(video_path: Path) -> Dict[str, Any]:
+    """A clip's first video stream, from the probe cache ({} if none)"""
+    for stream in get_video_info(video_path).get("streams", []):
+        if stream.get("codec_type") == "video":
+            return stream
     return {}
 
 
+def _video_height(video_path: Path, default: int = 720) -> int:
+    """Height of a clip's first video stream, from the probe cache"""
+    return int(_video_stream(video_path).get("height") or default)
+
+
+def _video_encoder_args(height: int, threads: Optional[int] = None) -> List[str]:
+    """
+    H.264 encoder arguments, using a hardware encoder when one is detected.
+
+    threads caps libx264 when several clips are encoded at once, keeping
+    the resolution-tuned preset and x264 params; hardware encoders
+    ignore it.
+    """
+    args = list(h264_encoder_args(height))
+    if threads and args[1] == "libx264":
+        for i, arg in enumerate(args[:-1]):
+            if arg == "-threads":
+                args[i + 1] = str(threads)
+            elif arg == "-x264-params":
+                args[i + 1] = ":".join(
+                    f"threads={threads}" if p.startswith("threads=") else p
+                    for p in args[i + 1].split(":")
+                )
+    return args
+
+
+def _concat_entry(path: Path) -> str:
+    """Concat-list line for path, with single quotes escaped as '\\''"""
+    quoted = os.fspath(path.resolve()).replace("'", "'\\''")
+    return f"file 'file:{quoted}'\n"
+
+
 def concatenate_videos_demuxer(
     video_paths: List[Path],
     output_path: Path,
@@ -54,41 +193,76 @@ def concatenate_videos_demuxer(
     Returns:
         True if successful
     """
-    # Create temporary file list
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-        for path in video_paths:
-            f.write(f"file '{path.absolute()}'\n")
-        list_file = f.name
+    probe_videos(video_paths)
 
-    try:
-        if reencode:
-            cmd = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-                "-i", list_file,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                "-c:a", "aac", "-b:a", "192k",
-                str(output_path)
-            ]
-        else:
-            cmd = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-                "-i", list_file,
-                "-c", "copy",
-                str(output_path)
-            ]
-
-        print(f"Concatenating {len(video_paths)} videos...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            print(f"Error: {result.stderr}")
+    # The list is fed over stdin, so no temp file is written per call
+    list_text = "".join(_concat_entry(path) for path in video_paths)
+
+    if reencode:
+        cmd = [
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+            *CONCAT_LIST_INPUT_ARGS, "-i", "pipe:0",
+            *_video_encoder_args(_video_height(video_paths[0])),
+            "-c:a", "aac", "-b:a", "192k",
+            *FINAL_OUTPUT_ARGS,
+            str(output_path)
+        ]
+    else:
+        cmd = [
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+            *CONCAT_LIST_INPUT_ARGS, "-i", "pipe:0",
+            "-c", "copy",
+            *FINAL_OUTPUT_ARGS,
+            str(output_path)
+        ]
+
+    print(f"Concatenating {len(video_paths)} videos...")
+    returncode, stderr = run_ffmpeg(
+        cmd, duration=_total_duration(video_paths), input_text=list_text
+    )
+
+    if returncode != 0:
+        print(f"Error: {stderr}")
+        return False
+
+    print(f"Output saved to: {output_path}")
+    return True
+
+
+# Stream fields that must agree for the concat demuxer to stream-copy safely.
+# The demuxer keeps only the first clip's H.264 parameter sets, so profile
+# and level have to match as well.
+_VIDEO_CONCAT_KEYS = (
+    "codec_name", "profile", "level", "width", "height", "r_frame_rate", "pix_fmt", "time_base"
+)
+_AUDIO_CONCAT_KEYS = ("codec_name", "sample_rate", "channels")
+
+
+def _uniform_params(video_paths: List[Path]) -> bool:
+    """True if every clip has one video and one audio stream with identical parameters"""
+    signatures = set()
+    for path in video_paths:
+        streams = get_video_info(path).get("streams", [])
+        video = [s for s in streams if s.get("codec_type") == "video"]
+        audio = [s for s in streams if s.get("codec_type") == "audio"]
+        if len(video) != 1 or len(audio) != 1:
+            return False
+        signatures.add((
+            tuple(video[0].get(k) for k in _VIDEO_CONCAT_KEYS),
+            tuple(audio[0].get(k) for k in _AUDIO_CONCAT_KEYS)
+        ))
+        if len(signatures) > 1:
             return False
+    return bool(signatures)
 
-        print(f"Output saved to: {output_path}")
-        return True
 
-    finally:
-        os.unlink(list_file)
+def _input_args(video_paths: List[Path]) -> List[str]:
+    """-i arguments for each clip of a multi-input filter graph"""
+    queue_size = str(INPUT_THREAD_QUEUE_SIZE)
+    args = []
+    for path in video_paths:
+        args += ("-thread_queue_size", queue_size, "-i", os.fspath(path))
+    return args
 
 
 def concatenate_videos_filter(
@@ -97,7 +271,9 @@ def concatenate_videos_filter(
 ) -> bool:
     """
     Concatenate videos using the concat filter (handles different formats).
-    Re-encodes all videos for compatibility.
+    Re-encodes all videos for compatibility, unless they already share
+    codec and stream parameters - then they are stream-copied through
+    the concat demuxer instead, falling back to re-encoding if that fails.
 
     Args:
         video_paths: List of video file paths in order
@@ -106,31 +282,113 @@ def concatenate_videos_filter(
     Returns:
         True if successful
     """
+    probe_videos(video_paths)
+    if _uniform_params(video_paths):
+        print("Inputs share codec parameters, concatenating without re-encoding")
+        if concatenate_videos_demuxer(video_paths, output_path, reencode=False):
+            return True
+        print("Stream copy failed, falling back to the concat filter")
+
     # Build filter complex string
-    inputs = []
+    n = len(video_paths)
+    filter_complex = "".join([f"[{i}:v][{i}:a]" for i in range(n)] + [
+        f"concat=n={n}:v=1:a=1[outv][outa]"
+    ])
+
+    cmd = [
+        "ffmpeg", "-y",
+        *_input_args(video_paths),
+        "-filter_complex", filter_complex,
+        "-map", "[outv]", "-map", "[outa]",
+        *_video_encoder_args(_video_height(video_paths[0])),
+        "-c:a", "aac", "-b:a", "192k",
+        *FINAL_OUTPUT_ARGS,
+        str(output_path)
+    ]
+
+    print(f"Concatenating {len(video_paths)} videos with filter...")
+    returncode, stderr = run_ffmpeg(cmd, duration=_total_duration(video_paths))
+
+    if returncode != 0:
+        print(f"Error: {stderr}")
+        return False
+
+    print(f"Output saved to: {output_path}")
+    return True
+
+
+def normalize_and_concat(
+    video_paths: List[Path],
+    output_path: Path,
+    target_resolution: str = "1280x720",
+    target_fps: int = 24
+) -> bool:
+    """
+    Normalize and concatenate videos in a single ffmpeg pass.
+
+    Equivalent to normalize_videos followed by concatenate_videos_filter,
+    but every clip is decoded and encoded once instead of twice, and no
+    intermediate files are written. Clips without an audio track get
+    silence so the concat filter always has audio to join.
+
+    Args:
+        video_paths: List of video file paths in order
+        output_path: Output video path
+        target_resolution: Target resolution (WxH)
+        target_fps: Target frame rate
+
+    Returns:
+        True if successful
+    """
+    probe_videos(video_paths)
+    width, height = target_resolution.split("x")
     filter_parts = []
 
     for i, path in enumerate(video_paths):
-        inputs.extend(["-i", str(path)])
-        filter_parts.append(f"[{i}:v][{i}:a]")
+        info = get_video_info(path)
+        has_audio = any(s.get("codec_type") == "audio" for s in info.get("streams", []))
+
+        filter_parts.append(
+            f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={target_fps},"
+            f"setsar=1,setpts=PTS-STARTPTS[v{i}];"
+        )
+        if has_audio:
+            filter_parts.append(
+                f"[{i}:a]aresample=48000:async=1,aformat=channel_layouts=stereo,"
+                f"asetpts=PTS-STARTPTS[a{i}];"
+            )
+        else:
+            duration = float(info.get("format", {}).get("duration", 0))
+            filter_parts.append(
+                f"anullsrc=r=48000:cl=stereo,atrim=duration={duration}[a{i}];"
+            )
 
-    filter_complex = "".join(filter_parts) + f"concat=n={len(video_paths)}:v=1:a=1[outv][outa]"
+    n = len(video_paths)
+    filter_complex = (
+        "".join(filter_parts)
+        + "".join(f"[v{i}][a{i}]" for i in range(n))
+        + f"concat=n={n}:v=1:a=1[outv][outa]"
+    )
 
     cmd = [
         "ffmpeg", "-y",
-        *inputs,
+        *_input_args(video_paths),
         "-filter_complex", filter_complex,
         "-map", "[outv]", "-map", "[outa]",
-        "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+        # filter_complex outputs don't carry the fps filter's rate to the muxer
+        "-r", str(target_fps),
+        *_video_encoder_args(int(height)),
         "-c:a", "aac", "-b:a", "192k",
+        *FINAL_OUTPUT_ARGS,
         str(output_path)
     ]
 
-    print(f"Concatenating {len(video_paths)} videos with filter...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    print(f"Normalizing and concatenating {n} videos in one pass...")
+    returncode, stderr = run_ffmpeg(cmd, duration=_total_duration(video_paths))
 
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+    if returncode != 0:
+        print(f"Error: {stderr}")
         return False
 
     print(f"Output saved to: {output_path}")
@@ -168,6 +426,7 @@ def add_audio_track(
             "-c:v", "copy",
             "-c:a", "aac", "-b:a", "192k",
             "-shortest",
+            *FINAL_OUTPUT_ARGS,
             str(output_path)
         ]
     else:
@@ -185,14 +444,15 @@ def add_audio_track(
             "-map", "0:v", "-map", "[aout]",
             "-c:v", "copy",
             "-c:a", "aac", "-b:a", "192k",
+            *FINAL_OUTPUT_ARGS,
             str(output_path)
         ]
 
     print(f"Adding audio track...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    returncode, stderr = run_ffmpeg(cmd, duration=_total_duration([video_path]))
 
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+    if returncode != 0:
+        print(f"Error: {stderr}")
         return False
 
     print(f"Output saved to: {output_path}")
@@ -218,33 +478,35 @@ def add_crossfade_transitions(
     if len(video_paths) < 2:
         print("Need at least 2 videos for transitions")
         return False
-
-    # This is complex - build filter chain for crossfades
-    inputs = []
-    for path in video_paths:
-        inputs.extend(["-i", str(path)])
+    probe_videos(video_paths)
 
     # Build filter complex for crossfades
     n = len(video_paths)
     filter_parts = []
 
-    # First, trim and prepare all clips
+    # First, trim and prepare all clips. xfade needs a constant frame rate,
+    # which setpts no longer reports, so restate the first clip's rate
+    frame_rate = _video_stream(video_paths[0]).get("r_frame_rate", "24/1")
     for i in range(n):
-        filter_parts.append(f"[{i}:v]setpts=PTS-STARTPTS[v{i}];")
+        filter_parts.append(f"[{i}:v]setpts=PTS-STARTPTS,fps={frame_rate}[v{i}];")
         filter_parts.append(f"[{i}:a]asetpts=PTS-STARTPTS[a{i}];")
 
-    # Apply crossfades sequentially
+    # Apply crossfades sequentially; each fade starts fade_duration before
+    # the end of everything joined so far
     current_v = "v0"
     current_a = "a0"
+    durations = [_total_duration([path]) for path in video_paths]
+    offset = 0.0
 
     for i in range(1, n):
+        offset += durations[i - 1] - fade_duration
         next_v = f"v{i}"
         next_a = f"a{i}"
         out_v = f"xv{i}" if i < n - 1 else "outv"
         out_a = f"xa{i}" if i < n - 1 else "outa"
 
         filter_parts.append(
-            f"[{current_v}][{next_v}]xfade=transition=fade:duration={fade_duration}:offset=7[{out_v}];"
+            f"[{current_v}][{next_v}]xfade=transition=fade:duration={fade_duration}:offset={offset:.3f}[{out_v}];"
         )
         filter_parts.append(
             f"[{current_a}][{next_a}]acrossfade=d={fade_duration}[{out_a}];"
@@ -257,19 +519,20 @@ def add_crossfade_transitions(
 
     cmd = [
         "ffmpeg", "-y",
-        *inputs,
+        *_input_args(video_paths),
         "-filter_complex", filter_complex,
         "-map", "[outv]", "-map", "[outa]",
-        "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+        *_video_encoder_args(_video_height(video_paths[0])),
         "-c:a", "aac", "-b:a", "192k",
+        *FINAL_OUTPUT_ARGS,
         str(output_path)
     ]
 
     print(f"Adding crossfade transitions...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    returncode, stderr = run_ffmpeg(cmd, duration=offset + durations[-1])
 
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+    if returncode != 0:
+        print(f"Error: {stderr}")
         # Fallback to simple concatenation
         print("Falling back to simple concatenation...")
         return concatenate_videos_demuxer(video_paths, output_path, reencode=True)
@@ -278,51 +541,179 @@ def add_crossfade_transitions(
     return True
 
 
+def _frame_rate(rate: str) -> float:
+    """Parse an ffprobe rate such as '24000/1001'"""
+    num, _, den = rate.partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _matches_target(info: Dict[str, Any], width: int, height: int, target_fps: int) -> bool:
+    """True if a probed clip is already h264/aac at the target size and frame rate"""
+    streams = info.get("streams", [])
+    video = [s for s in streams if s.get("codec_type") == "video"]
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+    if len(video) != 1 or any(s.get("codec_name") != "aac" for s in audio):
+        return False
+
+    v = video[0]
+    return (
+        v.get("codec_name") == "h264"
+        and v.get("width") == width
+        and v.get("height") == height
+        and abs(_frame_rate(v.get("avg_frame_rate", "0/0")) - target_fps) < 0.01
+    )
+
+
+def _normalize_one(
+    path: Path,
+    output_path: Path,
+    width: str,
+    height: str,
+    target_fps: int,
+    threads: int,
+    ladder: List[str] = ()
+) -> Tuple[int, str]:
+    """Transcode one clip to the target resolution and frame rate, then its ladder rungs"""
+    if _matches_target(get_video_info(path), int(width), int(height), target_fps):
+        # Already conformant - remux instead of a lossy re-encode
+        cmd = ["ffmpeg", "-y", "-i", str(path), "-map", "0", "-c", "copy", str(output_path)]
+    else:
+        cmd = [
+            "ffmpeg", "-y", "-i", str(path),
+            "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                   f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={target_fps}",
+            *_video_encoder_args(int(height), threads),
+            "-c:a", "aac", "-b:a", "192k",
+            str(output_path)
+        ]
+    returncode, stderr = run_ffmpeg(cmd)
+    if returncode != 0 or not ladder:
+        return returncode, stderr
+
+    # Lower rungs come from the normalized clip, not the (larger) source,
+    # all as outputs of one ffmpeg so it is decoded only once
+    cmd = ["ffmpeg", "-y", "-i", str(output_path)]
+    for resolution in ladder:
+        w, h = resolution.split("x")
+        cmd.extend([
+            "-map", "0:v", "-map", "0:a?",
+            "-vf", f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                   f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2",
+            *_video_encoder_args(int(h), threads),
+            "-c:a", "copy",
+            str(ladder_path(output_path, resolution))
+        ])
+    return run_ffmpeg(cmd)
+
+
+def _pixels(resolution: str) -> int:
+    w, h = resolution.split("x")
+    return int(w) * int(h)
+
+
+def ladder_path(normalized_path: Path, resolution: str) -> Path:
+    """Where normalize_videos writes the given ladder rung of a normalized clip"""
+    return normalized_path.with_name(f"{normalized_path.stem}_{resolution}.mp4")
+
+
 def normalize_videos(
     video_paths: List[Path],
     output_dir: Path,
     target_resolution: str = "1280x720",
-    target_fps: int = 24
+    target_fps: int = 24,
+    concurrency: Optional[int] = None,
+    ladder: Optional[List[str]] = None
 ) -> List[Path]:
     """
     Normalize videos to same resolution and frame rate.
 
+    Clips are transcoded by several ffmpeg processes at once, each with
+    a share of the cores - x264 scales poorly past a few threads, so this
+    keeps the machine busier than one wide encode at a time.
+    Clips that already match the target (h264/aac, same size and frame
+    rate) are remuxed with stream copy rather than re-encoded.
+
     Args:
         video_paths: List of input video paths
         output_dir: Directory for normalized videos
         target_resolution: Target resolution (WxH)
         target_fps: Target frame rate
+        concurrency: Parallel ffmpeg processes (default: one per 4 cores)
+        ladder: Extra lower resolutions (WxH) to derive from each normalized
+            clip, written alongside it (see ladder_path)
 
     Returns:
-        List of normalized video paths
+        List of normalized video paths (at target_resolution)
     """
     output_dir.mkdir(parents=True, exist_ok=True)
-    normalized_paths = []
+    if not video_paths:
+        return []
 
     width, height = target_resolution.split("x")
+    # Rungs are derived top-down and must be smaller than the target
+    top_pixels = int(width) * int(height)
+    ladder = sorted(
+        (r for r in ladder or [] if _pixels(r) < top_pixels), key=_pixels, reverse=True
+    )
+    cpus = os.cpu_count() or 1
+    if concurrency is None:
+        concurrency = max(1, cpus // 4)
+    concurrency = max(1, min(concurrency, len(video_paths)))
+    threads = max(1, cpus // concurrency)
+
+    normalized_paths = list(video_paths)  # Originals are kept for failed clips
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                _normalize_one, path, output_dir / f"normalized_{i:03d}.mp4",
+                width, height, target_fps, threads, ladder
+            ): i
+            for i, path in enumerate(video_paths)
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            returncode, stderr = future.result()
+            print(f"Normalized video {done}/{len(video_paths)}")
+            if returncode == 0:
+                normalized_paths[i] = output_dir / f"normalized_{i:03d}.mp4"
+            else:
+                print(f"Warning: Failed to normalize {video_paths[i]}: {stderr}")
 
-    for i, path in enumerate(video_paths):
-        output_path = output_dir / f"normalized_{i:03d}.mp4"
-
-        cmd = [
-            "ffmpeg", "-y", "-i", str(path),
-            "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-                   f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={target_fps}",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-            "-c:a", "aac", "-b:a", "192k",
-            str(output_path)
-        ]
+    return normalized_paths
 
-        print(f"Normalizing video {i + 1}/{len(video_paths)}...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
 
-        if result.returncode == 0:
-            normalized_paths.append(output_path)
-        else:
-            print(f"Warning: Failed to normalize {path}: {result.stderr}")
-            normalized_paths.append(path)  # Use original
+def _image_video_cmd(
+    image_path: Path,
+    output_path: Path,
+    duration: float,
+    zoom_effect: bool,
+    threads: Optional[int] = None
+) -> List[str]:
+    """ffmpeg command turning a still image into a 1280x720 clip"""
+    if zoom_effect:
+        # Ken Burns slow zoom effect. zoompan crops at whole input pixels,
+        # so the image is oversampled relative to the output to keep the
+        # motion smooth - 4x is enough; more only costs memory bandwidth
+        filter_vf = (
+            f"scale={1280 * KEN_BURNS_OVERSAMPLE}:-2,zoompan=z='min(zoom+0.0015,1.5)':x='iw/2-(iw/zoom/2)':"
+            f"y='ih/2-(ih/zoom/2)':d={int(duration * 24)}:s=1280x720:fps=24"
+        )
+    else:
+        filter_vf = "scale=1280:720:force_original_aspect_ratio=decrease,pad=1280:720:(ow-iw)/2:(oh-ih)/2"
 
-    return normalized_paths
+    return [
+        "ffmpeg", "-y",
+        "-loop", "1", "-i", str(image_path),
+        "-vf", filter_vf,
+        *_video_encoder_args(720, threads),
+        "-t", str(duration),
+        "-pix_fmt", "yuv420p",
+        str(output_path)
+    ]
 
 
 def create_video_from_image(
@@ -343,35 +734,74 @@ def create_video_from_image(
     Returns:
         True if successful
     """
-    if zoom_effect:
-        # Ken Burns slow zoom effect
-        filter_vf = (
-            f"scale=8000:-1,zoompan=z='min(zoom+0.0015,1.5)':x='iw/2-(iw/zoom/2)':"
-            f"y='ih/2-(ih/zoom/2)':d={int(duration * 24)}:s=1280x720:fps=24"
-        )
-    else:
-        filter_vf = "scale=1280:720:force_original_aspect_ratio=decrease,pad=1280:720:(ow-iw)/2:(oh-ih)/2"
-
-    cmd = [
-        "ffmpeg", "-y",
-        "-loop", "1", "-i", str(image_path),
-        "-vf", filter_vf,
-        "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-        "-t", str(duration),
-        "-pix_fmt", "yuv420p",
-        str(output_path)
-    ]
+    cmd = _image_video_cmd(image_path, output_path, duration, zoom_effect)
 
     print(f"Creating video from image...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    returncode, stderr = run_ffmpeg(cmd, duration=duration)
 
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+    if returncode != 0:
+        print(f"Error: {stderr}")
         return False
 
     return True
 
 
+def create_videos_from_images(
+    image_paths: List[Path],
+    output_dir: Path,
+    duration: float = 5.0,
+    zoom_effect: bool = False,
+    concurrency: Optional[int] = None
+) -> List[Optional[Path]]:
+    """
+    Create one video per image, running several ffmpeg processes at once.
+
+    Each process gets two encoder threads - a single still-image encode
+    can't keep many cores busy on its own.
+
+    Args:
+        image_paths: Input images
+        output_dir: Directory for the clips (named after each image)
+        duration: Duration of each clip in seconds
+        zoom_effect: Apply slow zoom (Ken Burns) effect
+        concurrency: Parallel ffmpeg processes (default: one per 2 cores)
+
+    Returns:
+        Clip path per image, or None where the encode failed
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if not image_paths:
+        return []
+
+    cpus = os.cpu_count() or 1
+    if concurrency is None:
+        concurrency = max(1, cpus // 2)
+    concurrency = max(1, min(concurrency, len(image_paths)))
+
+    output_paths: List[Optional[Path]] = [None] * len(image_paths)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                run_ffmpeg,
+                _image_video_cmd(
+                    path, output_dir / f"{path.stem}.mp4", duration, zoom_effect, threads=2
+                )
+            ): i
+            for i, path in enumerate(image_paths)
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            returncode, stderr = future.result()
+            print(f"Created video {done}/{len(image_paths)}")
+            if returncode == 0:
+                output_paths[i] = output_dir / f"{image_paths[i].stem}.mp4"
+            else:
+                print(f"Warning: Failed to create video from {image_paths[i]}: {stderr}")
+
+    return output_paths
+
+
 def main():
     parser = argparse.ArgumentParser(description="Video stitching and processing")
     subparsers = parser.add_subparsers(dest="command", help="Operation type")
@@ -384,6 +814,10 @@ def main():
     concat_parser.add_argument("--filter", action="store_true", help="Use filter method")
     concat_parser.add_argument("--transitions", action="store_true", help="Add crossfades")
     concat_parser.add_argument("--fade", type=float, default=0.5, help="Fade duration")
+    concat_parser.add_argument("--normalize", action="store_true",
+                               help="With --filter: scale/pad/retime clips in the same pass")
+    concat_parser.add_argument("-r", "--resolution", default="1280x720", help="Target resolution for --normalize")
+    concat_parser.add_argument("--fps", type=int, default=24, help="Target FPS for --normalize")
 
     # Add audio subcommand
     audio_parser = subparsers.add_parser("audio", help="Add audio track")
@@ -400,6 +834,8 @@ def main():
     norm_parser.add_argument("-o", "--output-dir", default="normalized", help="Output directory")
     norm_parser.add_argument("-r", "--resolution", default="1280x720", help="Target resolution")
     norm_parser.add_argument("--fps", type=int, default=24, help="Target FPS")
+    norm_parser.add_argument("-j", "--jobs", type=int, help="Parallel ffmpeg processes")
+    norm_parser.add_argument("--ladder", help="Lower resolutions to also derive, e.g. 854x480,640x360")
 
     # Image to video subcommand
     img_parser = subparsers.add_parser("img2vid", help="Create video from image")
@@ -408,6 +844,13 @@ def main():
     img_parser.add_argument("-d", "--duration", type=float, default=5.0, help="Duration")
     img_parser.add_argument("--zoom", action="store_true", help="Add Ken Burns zoom")
 
+    batch_parser = subparsers.add_parser("img2vid-batch", help="Create videos from many images")
+    batch_parser.add_argument("images", nargs="+", help="Input images")
+    batch_parser.add_argument("-o", "--output-dir", default="clips", help="Output directory")
+    batch_parser.add_argument("-d", "--duration", type=float, default=5.0, help="Duration")
+    batch_parser.add_argument("--zoom", action="store_true", help="Add Ken Burns zoom")
+    batch_parser.add_argument("-j", "--jobs", type=int, help="Parallel ffmpeg processes")
+
     args = parser.parse_args()
 
     if not check_ffmpeg():
@@ -417,6 +860,10 @@ def main():
         video_paths = [Path(v) for v in args.videos]
         if args.transitions:
             success = add_crossfade_transitions(video_paths, Path(args.output), args.fade)
+        elif args.filter and args.normalize:
+            success = normalize_and_concat(
+                video_paths, Path(args.output), args.resolution, args.fps
+            )
         elif args.filter:
             success = concatenate_videos_filter(video_paths, Path(args.output))
         else:
@@ -437,7 +884,9 @@ def main():
             [Path(v) for v in args.videos],
             Path(args.output_dir),
             args.resolution,
-            args.fps
+            args.fps,
+            concurrency=args.jobs,
+            ladder=args.ladder.split(",") if args.ladder else None
         )
         print(f"Normalized {len(normalized)} videos to {args.output_dir}/")
         success = True
@@ -450,6 +899,18 @@ def main():
             args.zoom
         )
 
+    elif args.command == "img2vid-batch":
+        clips = create_videos_from_images(
+            [Path(i) for i in args.images],
+            Path(args.output_dir),
+            args.duration,
+            args.zoom,
+            concurrency=args.jobs
+        )
+        created = sum(1 for c in clips if c)
+        print(f"Created {created}/{len(clips)} videos in {args.output_dir}/")
+        success = created == len(clips)
+
     else:
         parser.print_help()
         sys.exit(1)
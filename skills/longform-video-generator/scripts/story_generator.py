@@ -10,7 +10,12 @@ Scripts can be created programmatically or loaded from JSON files.
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from enum import Enum
+from pathlib import Path
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent))
+import json_io
 
 
 class ShotType(Enum):
@@ -39,7 +44,24 @@ class CameraMovement(Enum):
     ZOOM_OUT = "slow zoom out"
 
 
-@dataclass
+def _enum_key(value: str) -> str:
+    return value.replace("-", " ").replace("_", " ")
+
+
+def _enum_lookup(enum_cls) -> Dict[str, Enum]:
+    """Map each member's value, and its hyphen/underscore-free spelling, to the member"""
+    lookup = {}
+    for member in enum_cls:
+        lookup[member.value] = member
+        lookup[_enum_key(member.value)] = member
+    return lookup
+
+
+_SHOT_TYPES = _enum_lookup(ShotType)
+_CAMERA_MOVEMENTS = _enum_lookup(CameraMovement)
+
+
+@dataclass(slots=True)
 class Aesthetic:
     """
     Visual aesthetic definition for a video project.
@@ -55,8 +77,21 @@ class Aesthetic:
     grain: str = "subtle film grain"
     colors: List[str] = field(default_factory=lambda: ["natural", "balanced"])
 
+    # Built once and reused for every shot; cleared when a field is reassigned
+    # (mutating the colors list in place is not tracked)
+    _suffix: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any):
+        # object.__setattr__ - zero-argument super() breaks on slots dataclasses
+        object.__setattr__(self, name, value)
+        if name != "_suffix":
+            object.__setattr__(self, "_suffix", None)
+
     def to_prompt_suffix(self) -> str:
         """Generate prompt suffix capturing the aesthetic"""
+        if self._suffix is not None:
+            return self._suffix
+
         parts = [
             self.film_stock,
             self.lens,
@@ -66,7 +101,8 @@ class Aesthetic:
             self.grain,
             f"color palette: {', '.join(self.colors)}"
         ]
-        return ". ".join(parts)
+        self._suffix = ". ".join(parts)
+        return self._suffix
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Aesthetic":
@@ -83,7 +119,7 @@ class Aesthetic:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Shot:
     """A single shot/scene in the video"""
     scene_number: int
@@ -113,7 +149,7 @@ class Shot:
     character: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoScript:
     """Complete video script with all scenes"""
     title: str
@@ -138,8 +174,17 @@ class VideoScript:
     characters: Dict[str, str] = field(default_factory=dict)
     settings: Dict[str, str] = field(default_factory=dict)
 
+    # id(shot) -> (shot, aesthetic suffix used, prompt); shots are treated as
+    # read-only once prompts are built
+    _prompts: Dict[int, tuple] = field(default_factory=dict, init=False, repr=False, compare=False)
+
     def get_full_prompt(self, shot: Shot) -> str:
         """Build complete prompt for a shot with aesthetic and character info"""
+        suffix = self.aesthetic.to_prompt_suffix()
+        cached = self._prompts.get(id(shot))
+        if cached and cached[0] is shot and cached[1] is suffix:
+            return cached[2]
+
         parts = []
 
         # Add character description if specified
@@ -157,9 +202,11 @@ class VideoScript:
         parts.append(f"{shot.shot_type.value} framing")
 
         # Add aesthetic
-        parts.append(self.aesthetic.to_prompt_suffix())
+        parts.append(suffix)
 
-        return ". ".join(parts)
+        prompt = ". ".join(parts)
+        self._prompts[id(shot)] = (shot, suffix, prompt)
+        return prompt
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -227,19 +274,17 @@ class VideoScript:
         # Parse shots
         shots = []
         for s in data.get("shots", []):
-            # Parse shot type
-            shot_type_str = s.get("shot_type", "medium shot").replace("-", " ").replace("_", " ")
-            try:
-                shot_type = ShotType(shot_type_str)
-            except ValueError:
-                shot_type = ShotType.MEDIUM_SHOT
-
-            # Parse camera movement
-            cam_move_str = s.get("camera_movement", "static").replace("-", " ").replace("_", " ")
-            try:
-                camera_movement = CameraMovement(cam_move_str)
-            except ValueError:
-                camera_movement = CameraMovement.STATIC
+            # Parse shot type and camera movement (exact value first, then
+            # with hyphens/underscores read as spaces)
+            shot_type_str = s.get("shot_type", "medium shot")
+            shot_type = _SHOT_TYPES.get(shot_type_str) or _SHOT_TYPES.get(
+                _enum_key(shot_type_str), ShotType.MEDIUM_SHOT
+            )
+
+            cam_move_str = s.get("camera_movement", "static")
+            camera_movement = _CAMERA_MOVEMENTS.get(cam_move_str) or _CAMERA_MOVEMENTS.get(
+                _enum_key(cam_move_str), CameraMovement.STATIC
+            )
 
             shot = Shot(
                 scene_number=s.get("scene_number", len(shots) + 1),
@@ -280,18 +325,15 @@ class VideoScript:
 
 def save_script(script: VideoScript, path: str):
     """Save script to JSON file"""
-    with open(path, 'w') as f:
-        json.dump(script.to_dict(), f, indent=2)
+    json_io.dump_file(script.to_dict(), path)
 
 
 def load_script(path: str) -> VideoScript:
     """Load script from JSON file"""
-    with open(path) as f:
-        return VideoScript.from_dict(json.load(f))
+    return VideoScript.from_dict(json_io.load_file(path))
 
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1:
         # Load and print script from file
         script = load_script(sys.argv[1])
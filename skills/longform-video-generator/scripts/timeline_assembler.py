@@ -9,12 +9,55 @@ Key principle: Voiceover timing drives video timing.
 - Assemble with perfect audio/video sync
 """
 
+import os
+import sys
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
 
+sys.path.insert(0, str(Path(__file__).parent))
+from stitch_video import get_video_info, probe_videos
+from motion_graphics import H264_ENCODER_ARGS, detect_h264_encoder
+
+
+# Encoding parameters shared by every trimmed clip, so the concat demuxer
+# can stream-copy them: same frame rate, pixel format and timebase
+TIMELINE_FPS = 24
+CLIP_FORMAT_ARGS = [
+    "-r", str(TIMELINE_FPS), "-pix_fmt", "yuv420p", "-video_track_timescale", "12288"
+]
+# Parallel trim processes; more than this stops paying off as ffmpeg
+# instances contend for memory bandwidth and disk
+MAX_TRIM_WORKERS = 8
+
+# Source stream fields that must agree before trims can be stream-copied:
+# the concat demuxer keeps only the first clip's H.264 parameter sets
+COPY_TRIM_KEYS = ("codec_name", "profile", "level", "width", "height", "pix_fmt", "r_frame_rate")
+
+# libx264 preset for every encode. Trims are stream-copied into the final
+# video, so none of them is a throwaway intermediate; veryfast is ~1.7x
+# faster than fast at a similar size, while ultrafast more than doubles it
+DEFAULT_ENCODER_PRESET = "veryfast"
+
+
+def _probed_duration(video_path: Path, default: float) -> float:
+    """Container duration from the (cached) probe"""
+    try:
+        return float(get_video_info(video_path)["format"]["duration"])
+    except (KeyError, ValueError):
+        return default
+
+
+def _video_signature(video_path: Path) -> Optional[tuple]:
+    """COPY_TRIM_KEYS of a clip's first video stream, or None if it has none"""
+    for stream in get_video_info(video_path).get("streams", []):
+        if stream.get("codec_type") == "video":
+            return tuple(stream.get(k) for k in COPY_TRIM_KEYS)
+    return None
+
 
 @dataclass
 class TimelineSegment:
@@ -56,12 +99,54 @@ class TimelineAssembler:
     5. Output final video
     """
 
-    def __init__(self, temp_dir: Path, output_dir: Path):
+    def __init__(
+        self,
+        temp_dir: Path,
+        output_dir: Path,
+        encoder_preset: str = DEFAULT_ENCODER_PRESET,
+        hw_accel: bool = True
+    ):
+        """
+        Args:
+            temp_dir: Directory for trimmed clips and intermediate files
+            output_dir: Directory for final videos
+            encoder_preset: libx264 preset used when encoding in software
+            hw_accel: Encode with a detected hardware H.264 encoder
+                (NVENC, QSV, VideoToolbox) instead of libx264
+        """
         self.temp_dir = temp_dir
         self.output_dir = output_dir
+        self.encoder_preset = encoder_preset
+        self.hw_accel = hw_accel
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    def _video_encoder_args(self, threads: Optional[int] = None) -> List[str]:
+        """
+        H.264 encoder arguments: hardware when enabled and detected, else libx264.
+
+        threads caps libx264 so that parallel encodes together use about
+        one thread per core; by default a single encode gets every core.
+        """
+        encoder = detect_h264_encoder() if self.hw_accel else "libx264"
+        # VAAPI needs hwupload in every filtergraph; not worth it here
+        if encoder in H264_ENCODER_ARGS and encoder not in ("libx264", "h264_vaapi"):
+            return list(H264_ENCODER_ARGS[encoder])
+        return [
+            "-c:v", "libx264", "-preset", self.encoder_preset, "-crf", "23",
+            "-threads", str(threads or os.cpu_count() or 1)
+        ]
+
+    def _probe_all(self, paths: List[Path]) -> List[Dict[str, Any]]:
+        """
+        Probe every clip at once (ffprobe calls run in parallel).
+
+        Results land in stitch_video's probe cache, keyed by path and
+        invalidated by mtime/size, so later per-clip lookups - and later
+        runs over the same clips - don't spawn ffprobe again.
+        """
+        return probe_videos(paths)
+
     def build_timeline(
         self,
         voiceover_segments: List[Dict],  # [{"text": "...", "start": 0.0, "end": 3.5}, ...]
@@ -102,7 +187,10 @@ class TimelineAssembler:
         input_path: Path,
         output_path: Path,
         target_duration: float,
-        min_duration: float = 2.0
+        min_duration: float = 2.0,
+        stream_copy: bool = False,
+        source_duration: Optional[float] = None,
+        threads: Optional[int] = None
     ) -> bool:
         """
         Trim a video clip to match target duration.
@@ -112,21 +200,16 @@ class TimelineAssembler:
         - If clip is longer than needed: trim it
         - If clip is shorter than needed: use full clip (don't extend)
         - Enforce minimum duration for smooth cuts
-        """
-        # Get source clip duration
-        probe_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "json",
-            str(input_path)
-        ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
 
-        try:
-            probe_data = json.loads(result.stdout)
-            source_duration = float(probe_data["format"]["duration"])
-        except (json.JSONDecodeError, KeyError):
-            source_duration = 4.0  # Default assumption
+        Clips are always cut from their start, which is a keyframe, so with
+        stream_copy the trim is a remux instead of a re-encode. Only use it
+        when every clip in the timeline shares its H.264 parameters (see
+        prepare_timeline_clips). threads caps the encoder when several
+        trims run at once.
+        """
+        # Get source clip duration (4s default assumption)
+        if source_duration is None:
+            source_duration = _probed_duration(input_path, 4.0)
 
         # Enforce minimum duration to avoid jumpy cuts
         effective_duration = max(target_duration, min_duration)
@@ -135,11 +218,22 @@ class TimelineAssembler:
         # NEVER extend/loop - just use what we have
         final_duration = min(effective_duration, source_duration)
 
+        if stream_copy:
+            # -t on copied packets stops by decode timestamp and overshoots by
+            # the B-frame delay; a frame count keeps clips exactly in sync
+            num, _, den = (_video_signature(input_path)[-1] or "24/1").partition("/")
+            frames = round(final_duration * float(num) / float(den or 1))
+            limit_args = ["-frames:v", str(frames)]
+            codec_args = ["-c:v", "copy", "-avoid_negative_ts", "make_zero"]
+        else:
+            limit_args = ["-t", str(final_duration)]
+            codec_args = [*self._video_encoder_args(threads), *CLIP_FORMAT_ARGS]
+
         cmd = [
             "ffmpeg", "-y",
             "-i", str(input_path),
-            "-t", str(final_duration),
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+            *limit_args,
+            *codec_args,
             "-an",  # Remove audio from clip
             str(output_path)
         ]
@@ -147,6 +241,20 @@ class TimelineAssembler:
         result = subprocess.run(cmd, capture_output=True, text=True)
         return result.returncode == 0
 
+    def _can_stream_copy(self, timeline: Timeline) -> bool:
+        """True if every source clip is H.264 with identical stream parameters"""
+        # One parallel batch of ffprobes up front; later duration and
+        # signature lookups then come from the probe cache
+        paths = [
+            segment.video_path for segment in timeline.segments
+            if segment.video_path and segment.video_path.exists()
+        ]
+        self._probe_all(paths)
+
+        signatures = {_video_signature(path) for path in paths}
+        signature = signatures.pop() if len(signatures) == 1 else None
+        return signature is not None and signature[0] == "h264"
+
     def prepare_timeline_clips(self, timeline: Timeline, min_duration: float = 2.5) -> bool:
         """
         Prepare all clips by trimming to match voiceover timing.
@@ -156,6 +264,14 @@ class TimelineAssembler:
         print("  [Timeline] Preparing clips to match voiceover timing...")
         print(f"    Minimum clip duration: {min_duration}s")
 
+        # If all sources are H.264 with identical parameters, trims are
+        # remuxed and still concatenate cleanly; otherwise all are re-encoded
+        # to CLIP_FORMAT_ARGS so they match each other
+        stream_copy = self._can_stream_copy(timeline)
+        if stream_copy:
+            print("    Sources share H.264 parameters - trimming without re-encoding")
+
+        jobs = []
         for segment in timeline.segments:
             if not segment.video_path or not segment.video_path.exists():
                 print(f"    WARNING: Missing video for segment {segment.index}")
@@ -172,11 +288,32 @@ class TimelineAssembler:
             else:
                 print(f"    Clip {segment.index}: {effective_duration:.2f}s")
 
-            if self.trim_clip_to_duration(segment.video_path, trimmed_path, effective_duration, min_duration):
-                segment.trimmed_video_path = trimmed_path
-            else:
-                print(f"    ERROR: Failed to trim clip {segment.index}")
-                segment.trimmed_video_path = segment.video_path
+            jobs.append((segment, trimmed_path, effective_duration))
+
+        if not jobs:
+            return True
+
+        # Trims are independent ffmpeg processes; run several at once
+        workers = min(len(jobs), MAX_TRIM_WORKERS, max(1, (os.cpu_count() or 2) // 2))
+        # Split the cores between workers instead of each encoder sizing
+        # its thread pool for the whole machine
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    self.trim_clip_to_duration,
+                    segment.video_path, trimmed_path, effective_duration, min_duration,
+                    stream_copy, _probed_duration(segment.video_path, 4.0), threads
+                ): (segment, trimmed_path)
+                for segment, trimmed_path, effective_duration in jobs
+            }
+            for future in as_completed(futures):
+                segment, trimmed_path = futures[future]
+                if future.result():
+                    segment.trimmed_video_path = trimmed_path
+                else:
+                    print(f"    ERROR: Failed to trim clip {segment.index}")
+                    segment.trimmed_video_path = segment.video_path
 
         return True
 
@@ -193,15 +330,25 @@ class TimelineAssembler:
                 if segment.trimmed_video_path and segment.trimmed_video_path.exists():
                     f.write(f"file '{segment.trimmed_video_path.absolute()}'\n")
 
+        # Trimmed clips share CLIP_FORMAT_ARGS, so they can be joined
+        # without re-encoding. No +faststart: this is an intermediate, and
+        # mix_final_audio moves the moov atom when writing the final file
         cmd = [
             "ffmpeg", "-y",
             "-f", "concat", "-safe", "0",
             "-i", str(concat_list),
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-            "-movflags", "+faststart",
+            "-c", "copy",
             str(output_path)
         ]
 
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            return True
+
+        # Clips that didn't come out of trim_clip_to_duration may differ
+        print("    Stream copy failed, re-encoding...")
+        codec_at = cmd.index("-c")
+        cmd[codec_at:codec_at + 2] = self._video_encoder_args()
         result = subprocess.run(cmd, capture_output=True, text=True)
         return result.returncode == 0
 
@@ -219,68 +366,28 @@ class TimelineAssembler:
         1. Fade last 1.5s of video to black
         2. Black screen for remaining audio
         3. Professional ending like movie trailers
+
+        Done in one encode: tpad appends the black frames after the fade,
+        so no separate black clip or concat pass is needed.
         """
         gap = target_duration - current_duration
         fade_start = max(0, current_duration - 1.5)
 
-        # Get video dimensions
-        probe_cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "json",
-            str(video_path)
-        ]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        try:
-            stream = json.loads(probe_result.stdout)["streams"][0]
-            width, height = stream["width"], stream["height"]
-        except:
-            width, height = 1280, 720
-
-        # Step 1: Create black video for the gap
-        black_path = self.temp_dir / "black_outro.mp4"
-        black_cmd = [
-            "ffmpeg", "-y",
-            "-f", "lavfi",
-            "-i", f"color=c=black:s={width}x{height}:d={gap + 0.5}:r=24",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-            str(black_path)
-        ]
-        subprocess.run(black_cmd, capture_output=True)
-
-        # Step 2: Add fade-out to main video
-        faded_path = self.temp_dir / "video_faded.mp4"
-        fade_cmd = [
+        output_path = self.temp_dir / "video_with_outro.mp4"
+        cmd = [
             "ffmpeg", "-y",
             "-i", str(video_path),
-            "-vf", f"fade=t=out:st={fade_start}:d=1.5:color=black",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+            "-vf", (
+                f"fade=t=out:st={fade_start}:d=1.5:color=black,"
+                f"tpad=stop_mode=add:stop_duration={gap + 0.5}:color=black"
+            ),
+            *self._video_encoder_args(),
             "-an",
-            str(faded_path)
-        ]
-        fade_result = subprocess.run(fade_cmd, capture_output=True)
-
-        if fade_result.returncode != 0:
-            return None
-
-        # Step 3: Concatenate faded video + black
-        concat_list = self.temp_dir / "outro_concat.txt"
-        with open(concat_list, "w") as f:
-            f.write(f"file '{faded_path.absolute()}'\n")
-            f.write(f"file '{black_path.absolute()}'\n")
-
-        output_path = self.temp_dir / "video_with_outro.mp4"
-        concat_cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat", "-safe", "0",
-            "-i", str(concat_list),
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
             "-t", str(target_duration),
             str(output_path)
         ]
 
-        result = subprocess.run(concat_cmd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True)
 
         if result.returncode == 0 and output_path.exists():
             print(f"    Created fade-out with {gap:.1f}s black (audio continues)")
@@ -346,11 +453,107 @@ class TimelineAssembler:
 
         return result.returncode == 0
 
+    def assemble_single_pass(
+        self,
+        timeline: Timeline,
+        output_path: Path,
+        music_volume: float = 0.15,
+        min_duration: float = 2.5
+    ) -> Optional[float]:
+        """
+        Trim, concatenate, add the outro and mix audio in one ffmpeg run.
+
+        Same result as the multi-pass assemble steps, but the clips are
+        decoded once and the video is encoded once. Returns the video
+        duration, or None if ffmpeg failed.
+        """
+        segments = [
+            s for s in timeline.segments if s.video_path and s.video_path.exists()
+        ]
+        if not segments or not timeline.voiceover_path:
+            return None
+        self._probe_all([s.video_path for s in segments])
+
+        width, height = 1280, 720
+        for stream in get_video_info(segments[0].video_path).get("streams", []):
+            if stream.get("codec_type") == "video":
+                width, height = stream.get("width", width), stream.get("height", height)
+                break
+
+        inputs = ["-i", str(timeline.voiceover_path)]
+        has_music = bool(timeline.music_path and timeline.music_path.exists())
+        if has_music:
+            inputs += ["-i", str(timeline.music_path)]
+        first_clip = len(inputs) // 2
+
+        # Clip lengths follow trim_clip_to_duration: the VO segment, at
+        # least min_duration, never more than the source
+        filter_parts = []
+        video_duration = 0.0
+        for i, segment in enumerate(segments):
+            duration = min(
+                max(segment.duration, min_duration),
+                _probed_duration(segment.video_path, 4.0)
+            )
+            video_duration += duration
+            # Input -t stops demuxing early; trim makes the cut frame-exact
+            inputs += ["-t", f"{duration:.3f}", "-i", str(segment.video_path)]
+            filter_parts.append(
+                f"[{first_clip + i}:v]trim=duration={duration:.3f},setpts=PTS-STARTPTS,"
+                f"fps={TIMELINE_FPS},scale={width}:{height},setsar=1,format=yuv420p[v{i}];"
+            )
+
+        n = len(segments)
+        filter_parts.append("".join(f"[v{i}]" for i in range(n)) + f"concat=n={n}:v=1:a=0[vcat];")
+
+        # Outro: fade the last 1.5s to black and hold black until the
+        # voiceover (plus 0.5s) has finished
+        if video_duration < timeline.voiceover_duration:
+            target_duration = timeline.voiceover_duration + 0.5
+            fade_start = max(0, video_duration - 1.5)
+            filter_parts.append(
+                f"[vcat]fade=t=out:st={fade_start:.3f}:d=1.5:color=black,"
+                f"tpad=stop_mode=add:stop_duration={target_duration - video_duration:.3f}"
+                f":color=black[vout];"
+            )
+            video_duration = target_duration
+        else:
+            filter_parts.append("[vcat]null[vout];")
+
+        if has_music:
+            filter_parts.append(
+                f"[0:a]aresample=48000[vo];"
+                f"[1:a]aresample=48000,volume={music_volume}[music];"
+                f"[vo][music]amix=inputs=2:duration=first:normalize=0[aout]"
+            )
+        else:
+            filter_parts.append("[0:a]aresample=48000[aout]")
+
+        cmd = [
+            "ffmpeg", "-y",
+            *inputs,
+            "-filter_complex", "".join(filter_parts),
+            "-map", "[vout]", "-map", "[aout]",
+            *self._video_encoder_args(),
+            "-c:a", "aac", "-b:a", "256k",
+            "-ar", "48000",
+            "-movflags", "+faststart",
+            str(output_path)
+        ]
+
+        print(f"  [Timeline] Assembling {n} clips in a single pass...")
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"    Single-pass error: {result.stderr[-300:]}")
+            return None
+        return video_duration
+
     def assemble(
         self,
         timeline: Timeline,
         output_path: Path,
-        music_volume: float = 0.15
+        music_volume: float = 0.15,
+        single_pass: bool = True
     ) -> Dict[str, Any]:
         """
         Full assembly pipeline:
@@ -359,11 +562,29 @@ class TimelineAssembler:
         3. Ensure video >= voiceover duration
         4. Mix audio
         5. Output final video
+
+        When the clips would have to be re-encoded to trim them anyway,
+        all steps run as one ffmpeg pass (assemble_single_pass) unless
+        single_pass is False; the step-by-step path is the fallback.
         """
         print("\n  [Timeline] Starting assembly...")
         print(f"    Voiceover duration: {timeline.voiceover_duration:.2f}s")
         print(f"    Segments: {len(timeline.segments)}")
 
+        # Stream-copy trims + concat are cheaper than any encode, so the
+        # fused pass only pays off when the sources don't allow them
+        if single_pass and not self._can_stream_copy(timeline):
+            video_duration = self.assemble_single_pass(timeline, output_path, music_volume)
+            if video_duration is not None:
+                print(f"  [Timeline] Assembly complete: {output_path}")
+                return {
+                    "success": True,
+                    "local_path": str(output_path),
+                    "duration": timeline.voiceover_duration,
+                    "video_duration": video_duration
+                }
+            print("    Falling back to step-by-step assembly...")
+
         # Step 1: Prepare clips
         if not self.prepare_timeline_clips(timeline):
             return {"success": False, "error": "Failed to prepare clips"}
@@ -374,17 +595,7 @@ class TimelineAssembler:
             return {"success": False, "error": "Failed to concatenate clips"}
 
         # Verify concat duration
-        probe_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "json",
-            str(concat_path)
-        ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        try:
-            video_duration = float(json.loads(result.stdout)["format"]["duration"])
-        except:
-            video_duration = 0
+        video_duration = _probed_duration(concat_path, 0)
 
         print(f"    Video duration: {video_duration:.2f}s")
 
@@ -10,7 +10,6 @@ Includes Director review process for quality control.
 import os
 import sys
 import json
-import subprocess
 import argparse
 from pathlib import Path
 from typing import Optional, List, Dict, Any
@@ -19,11 +18,13 @@ from dataclasses import dataclass
 
 sys.path.insert(0, str(Path(__file__).parent))
 from fal_wrapper import FalClient, FalConfig, MODELS
+from pipeline_log import setup_logging
 from story_generator import VideoScript, Shot, load_script
 from director import Director, DirectorConfig, ReviewStatus
 from audio_mixer import AudioMixer, AudioMixConfig
 from elevenlabs_client import ElevenLabsClient, VoiceoverResult
 from timeline_assembler import TimelineAssembler, assemble_with_timing
+from stitch_video import concatenate_videos_demuxer
 
 
 @dataclass
@@ -460,24 +461,9 @@ class VideoPipeline:
         print(f"  [Assembly] Simple concatenation of {len(video_clips)} clips...")
 
         concat_path = self.dirs["temp"] / "concatenated.mp4"
-        list_file = self.dirs["temp"] / "concat_list.txt"
-
-        with open(list_file, 'w') as f:
-            for clip in video_clips:
-                f.write(f"file '{clip.absolute()}'\n")
-
-        concat_cmd = [
-            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-            "-i", str(list_file),
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-            "-c:a", "aac", "-b:a", "192k",
-            "-movflags", "+faststart",
-            str(concat_path)
-        ]
-
-        result = subprocess.run(concat_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"    Concat error: {result.stderr[:200]}")
+
+        # The concat list goes to ffmpeg over stdin - no list file per run
+        if not concatenate_videos_demuxer(video_clips, concat_path, reencode=True):
             return {"success": False, "error": "Failed to concatenate videos"}
 
         # Audio mixing
@@ -612,6 +598,7 @@ class VideoPipeline:
 
 
 def main():
+    setup_logging()
     parser = argparse.ArgumentParser(description="Professional video generation pipeline")
     parser.add_argument("script", help="JSON script file defining the video")
     parser.add_argument("-o", "--output", default="./video_output", help="Output directory")